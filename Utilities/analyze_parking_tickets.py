@@ -1,34 +1,15 @@
+import os
 import pandas as pd
 from data.data_fetcher import DataFetcher
+from data.violation_times import format_minutes, MISSING_MINUTE
 from geoclient.sweep_rules_geoclient import get_sweep_rules_by_address
 
 # Ensure all rows are displayed when printing DataFrames
 pd.set_option('display.max_rows', None)
 
-def convert_time_format(time_str):
-    """
-    Convert time from format '0157A' to '01:57 AM'.
-
-    Args:
-        time_str (str): Time string in the format 'HHMMX', where X is 'A' or 'P'.
+CITYWIDE_CSV = "/Users/nanabonsu/Downloads/StreetCleaningViolations.csv"
 
-    Returns:
-        str: Time string in the format 'HH:MM AM/PM'.
-    """
-    try:
-        # Extract hour, minute, and period
-        hour = int(time_str[:2])
-        minute = int(time_str[2:4])
-        period = 'AM' if time_str[4] == 'A' else 'PM'
-
-        # Format the time
-        return f"{hour:02}:{minute:02} {period}"
-    except Exception as e:
-        print(f"Error converting time format: {e}")
-        return None
-
-
-def analyze_parking_tickets(street_name, house_number, violation_code=21):
+def analyze_parking_tickets(street_name, house_number, violation_code=21, csv_path=CITYWIDE_CSV):
     """
     Analyze parking tickets for a given street address and show how they vary by date and time.
 
@@ -36,16 +17,23 @@ def analyze_parking_tickets(street_name, house_number, violation_code=21):
         street_name (str): The name of the street (e.g., "Valentine Ave").
         house_number (str): The house number (e.g., "2544").
         violation_code (int): The violation code to filter by (default is 21 for street cleaning).
+        csv_path (str): Citywide StreetCleaningViolations.csv to read.
 
     Returns:
         None
     """
-    # Initialize DataFetcher with the path to the CSV file
-    data_fetcher = DataFetcher(data_path="/Users/nanabonsu/Downloads/StreetCleaningViolations.csv")
+    data_fetcher = DataFetcher(data_path=os.path.dirname(csv_path))
+
+    # Find the house number range of the address's side of the block
+    if not data_fetcher.get_street_centerline_by_address(street_name, house_number):
+        print(f"{house_number} {street_name} was not found in the street centerline data.")
+        return
+    block_range = (data_fetcher.current_block_low, data_fetcher.current_block_high)
 
-    # Fetch parking violations for the entire block
+    # Stream the citywide file, keeping only this block's violations
     print(f"Fetching parking violations for {street_name} near {house_number}...")
-    violations = data_fetcher.get_violations_for_whole_block(street_name, house_number, violation_code)
+    data_fetcher.load_csv_data(csv_path, street_name=street_name, violation_code=violation_code, block_range=block_range)
+    violations = data_fetcher.violations_data
 
     info = get_sweep_rules_by_address(house_number, street_name)
     print(info["rules"][0]) #print the sweep rules for the address
@@ -54,21 +42,21 @@ def analyze_parking_tickets(street_name, house_number, violation_code=21):
         print(f"No parking violations found for {street_name} near {house_number}.")
         return
 
-    # Convert the "Issue Date" column to datetime
-    violations['Issue Date'] = pd.to_datetime(violations['Issue Date'])
-
-    # Convert the "Violation Time" column to standard time format
-    violations['Violation Time'] = violations['Violation Time'].apply(convert_time_format)
+    # "Issue Date" is already datetime64 and "Violation Minute" the decoded "Violation Time"
+    violations['Minute'] = violations['Violation Minute']
+    malformed_count = int((violations['Minute'] == MISSING_MINUTE).sum())
+    if malformed_count:
+        print(f"Skipped {malformed_count} violations with malformed times.")
 
     # Extract date and time components
     violations['Date'] = violations['Issue Date'].dt.date
-    violations['Time'] = violations['Violation Time']
 
     # Group by date and count violations
     violations_by_date = violations.groupby('Date').size().reset_index(name='Count')
 
     # Group by time and count violations
-    violations_by_time = violations.groupby('Time').size().reset_index(name='Count')
+    violations_by_time = violations[violations['Minute'] != MISSING_MINUTE].groupby('Minute').size().reset_index(name='Count')
+    violations_by_time.insert(0, 'Time', violations_by_time['Minute'].map(lambda m: format_minutes(m, twelve_hour=True)))
 
     # Group by month and count violations
     violations['Month'] = violations['Issue Date'].dt.month
@@ -106,17 +94,12 @@ def analyze_parking_tickets(street_name, house_number, violation_code=21):
         try:
             import matplotlib.pyplot as plt
 
-            # Prepare data for plotting
-            violations_by_time['Time'] = pd.to_datetime(violations_by_time['Time'], format='%I:%M %p').dt.time
-
             # Filter times to 30-minute increments starting at the hour
-            filtered_times = violations_by_time['Time'].apply(
-                lambda t: t.replace(minute=(0 if t.minute < 30 else 30), second=0)
-            )
-            violations_by_time['Filtered Time'] = filtered_times
+            violations_by_time['Filtered Time'] = (violations_by_time['Minute'] // 30) * 30
 
             # Aggregate data by 30-minute increments
-            aggregated_data = violations_by_time.groupby('Filtered Time').size().reset_index(name='Count')
+            aggregated_data = violations_by_time.groupby('Filtered Time')['Count'].sum().reset_index()
+            aggregated_data['Filtered Time'] = aggregated_data['Filtered Time'].map(format_minutes)
 
             plt.figure(figsize=(12, 6))
             plt.bar(aggregated_data['Filtered Time'].astype(str), aggregated_data['Count'], color='purple', alpha=0.7)
@@ -0,0 +1,73 @@
+"""Micro-benchmark: BlockIndex lookups vs. the boolean-mask scan on a synthetic borough frame.
+
+Run from the project root:
+    python -m benchmarks.bench_block_index --rows 10000000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from data.block_index import BlockIndex
+
+
+def make_violations_frame(rows, num_streets=5000, seed=0):
+    '''Build a synthetic borough violations frame with string columns like the CSVs'''
+    rng = np.random.default_rng(seed)
+    streets = np.array([f"STREET {i} AVE" for i in range(num_streets)], dtype=object)
+    house_numbers = rng.integers(1, 5000, rows).astype(str).astype(object)
+    return pd.DataFrame({
+        'Street Name': streets[rng.integers(0, num_streets, rows)],
+        'Violation Code': rng.choice(np.array([21, 14, 38, 40, 71]), rows),
+        'House Number': house_numbers,
+    })
+
+
+def mask_scan(frame, street_name, violation_code, block_range):
+    '''The filter get_parking_violations_by_street used before BlockIndex'''
+    filtered = frame[(frame['Street Name'] == street_name) & (frame['Violation Code'] == violation_code)]
+    low, high = block_range
+    return filtered[(filtered['House Number'] >= str(low)) & (filtered['House Number'] <= str(high))]
+
+
+def best_of(func, repeat):
+    '''Best wall time of `repeat` calls, in seconds'''
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Building synthetic frame with {args.rows:,} rows...")
+    frame = make_violations_frame(args.rows)
+    rng = np.random.default_rng(1)
+    queries = [
+        (f"STREET {rng.integers(0, 5000)} AVE", 21, (low, low + 98))
+        for low in rng.integers(1, 4900, args.queries)
+    ]
+
+    start = time.perf_counter()
+    index = BlockIndex(frame)
+    build_seconds = time.perf_counter() - start
+
+    scan_seconds = best_of(lambda: mask_scan(frame, *queries[0]), args.repeat)
+    lookup_seconds = best_of(lambda: [index.lookup(*query) for query in queries], args.repeat) / len(queries)
+
+    print("=" * 60)
+    print(f"Index build (one time):   {build_seconds * 1000:10.1f} ms")
+    print(f"Mask scan per query:      {scan_seconds * 1000:10.3f} ms")
+    print(f"Index lookup per query:   {lookup_seconds * 1000:10.3f} ms")
+    print(f"Speedup per query:        {scan_seconds / lookup_seconds:10.0f}x")
+    print(f"Break-even after:         {build_seconds / max(scan_seconds - lookup_seconds, 1e-9):10.1f} queries")
+
+
+if __name__ == "__main__":
+    main()
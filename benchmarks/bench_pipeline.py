@@ -0,0 +1,241 @@
+"""Benchmark every pipeline stage on synthetic data served from a local Socrata stub.
+
+Generates a borough violations CSV, centerline segments and sweep histories at the requested
+scale, then times CSV load (cold, columnar store, frame cache), block filter, time parsing,
+sweep histogram, likelihood, address cache, centerline lookup and sweep sync. Results are
+written as JSON so runs from different commits can be compared.
+
+Run from the project root:
+    python -m benchmarks.bench_pipeline --rows 1000000 --output bench.json
+    python -m benchmarks.bench_pipeline --rows 1000000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+from benchmarks import synthetic
+from benchmarks.socrata_stub import SocrataStub, StubDataset
+
+
+def measure(func, repeat=3, items=1):
+    """
+    Time func() `repeat` times.
+
+    Args:
+        func (callable): Work to time.
+        repeat (int): Number of runs.
+        items (int): Units of work per run (queries, rows, ...), for the per-item figure.
+
+    Returns:
+        dict: runs, items, min/median/max milliseconds per run and microseconds per item at the median.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    median = float(np.median(timings))
+    return {
+        "runs": repeat,
+        "items": items,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(median, 3),
+        "max_ms": round(max(timings), 3),
+        "per_item_us": round(median * 1000 / max(items, 1), 3),
+    }
+
+
+def git_commit():
+    '''Short hash of the checked out commit, or None outside a git checkout'''
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def start_stub(borough_code, num_streets, blocks_per_street, visits_per_segment, latency):
+    '''Start a Socrata stub with the borough's centerline and sweep history; returns (stub, centerline records)'''
+    centerline = synthetic.centerline_records(borough_code, num_streets, blocks_per_street)
+    sweeps = synthetic.sweep_records([row["physicalid"] for row in centerline], visits_per_segment)
+    stub = SocrataStub({
+        config.DATASET_IDS['street_centerline']: StubDataset(centerline, index_columns=['full_street_name']),
+        config.DATASET_IDS['sweep_nyc']: StubDataset(sweeps, index_columns=['physical_id']),
+    }, latency=latency).start()
+    return stub, centerline, sweeps
+
+
+def run_stages(args, data_path, stub, centerline, sweeps):
+    '''Time each stage; the data modules are imported here, after config points at the stub'''
+    from data.data_fetcher import DataFetcher
+    from data.frame_cache import FrameCache
+    from data.violation_times import decode_violation_times
+    from data.sweep_histogram import sweep_time_histogram, sweep_time_histograms
+    from data.address_mapper import AddressMapper
+    from data.sweep_store import SweepStore
+    from data_analysis import ticket_likelihood
+
+    borough = args.borough
+    rng = np.random.default_rng(1)
+    stages = {}
+
+    def report(name, result):
+        stages[name] = result
+        print(f"{name:<22} median {result['median_ms']:>10.3f} ms  ({result['per_item_us']:>10.3f} us/item)")
+
+    # CSV load: CSV -> columnar store -> schema -> BlockIndex, then from the store, then from the frame cache
+    data_fetcher = DataFetcher(data_path=data_path)
+
+    def cold_load():
+        data_fetcher.violation_store.store_dir = tempfile.mkdtemp(prefix='violations_', dir='.')
+        data_fetcher.frame_cache = FrameCache()
+        data_fetcher.load_csv_for_borough(borough)
+
+    def store_load():
+        data_fetcher.frame_cache = FrameCache()
+        data_fetcher.load_csv_for_borough(borough)
+
+    report("csv_load_cold", measure(cold_load, repeat=1, items=args.rows))
+    report("csv_load_store", measure(store_load, repeat=args.repeat, items=args.rows))
+    report("csv_load_cached", measure(lambda: data_fetcher.load_csv_for_borough(borough), repeat=args.repeat))
+
+    # Block filter: indexed lookups of random block sides
+    block_index = data_fetcher.block_index
+    queries = []
+    for position in rng.integers(0, len(centerline), args.queries):
+        segment = centerline[position]
+        queries.append((segment["full_street_name"], 21, (segment["l_low_hn"], segment["l_high_hn"])))
+    report("block_filter", measure(lambda: [block_index.lookup(*query) for query in queries], args.repeat, len(queries)))
+
+    # Time parsing: raw 'Violation Time' text to minutes of day
+    raw_times = pd.read_csv(os.path.join(data_path, synthetic.borough_csv_name(borough)), usecols=['Violation Time'], dtype=str)['Violation Time']
+    report("time_parsing", measure(lambda: decode_violation_times(raw_times), args.repeat, len(raw_times)))
+
+    # Sweep histogram: one segment at a time, and every segment with one bincount
+    sweep_ids = np.array([row["physical_id"] for row in sweeps], dtype=object)
+    sweep_times = np.array([row["date_visited"] for row in sweeps], dtype=object)
+    per_segment = np.split(sweep_times, np.flatnonzero(sweep_ids[1:] != sweep_ids[:-1]) + 1)
+    sample = per_segment[:args.queries]
+    report("histogram", measure(lambda: [sweep_time_histogram(times) for times in sample], args.repeat, len(sample)))
+    visited = sweep_times.astype('datetime64[ms]')
+    report("histogram_bulk", measure(lambda: sweep_time_histograms(sweep_ids, visited), args.repeat, len(per_segment)))
+
+    # Likelihood: share of a block's violations after the sweep
+    histograms = [sweep_time_histogram(times) for times in sample]
+    blocks = [block_index.lookup(*query)['Violation Minute'].to_numpy() for query in queries[:len(sample)]]
+    pairs = [(minutes, histogram) for minutes, histogram in zip(blocks, histograms) if len(minutes)]
+    report("likelihood", measure(lambda: [ticket_likelihood(minutes, 600, histogram) for minutes, histogram in pairs], args.repeat, len(pairs)))
+
+    # Address cache: writes, LRU hits, then reads from SQLite through a fresh mapper
+    addresses = [(row["full_street_name"], row["l_low_hn"], row["physicalid"], borough) for row in centerline[:args.queries]]
+    mapper = AddressMapper(db_file='address_bench.sqlite3')
+
+    def cache_writes():
+        for street, house, pid, code in addresses:
+            mapper.cache_physical_id(street, house, pid, borough_code=code)
+        mapper.flush()
+
+    report("address_cache_write", measure(cache_writes, 1, len(addresses)))
+    report("address_cache_lru", measure(lambda: [mapper.get_cached_physical_id(s, h, borough_code=c) for s, h, _, c in addresses], args.repeat, len(addresses)))
+    cold_mapper = AddressMapper(db_file='address_bench.sqlite3', lru_size=1)
+    report("address_cache_db", measure(lambda: [cold_mapper.get_cached_physical_id(s, h, borough_code=c) for s, h, _, c in addresses], args.repeat, len(addresses)))
+
+    # Network stages against the stub: centerline lookups and a sweep history sync
+    lookups = [centerline[position] for position in rng.integers(0, len(centerline), min(args.queries, 50))]
+    requests_before = stub.requests
+    report("centerline_lookup", measure(
+        lambda: [data_fetcher.get_street_centerline_by_address(row["full_street_name"], row["l_low_hn"], borough) for row in lookups],
+        1, len(lookups)
+    ))
+    ids = [row["physicalid"] for row in lookups]
+    report("sweep_sync", measure(lambda: SweepStore(db_file='sweep_bench.sqlite3').sync(data_fetcher, ids), 1, len(ids)))
+    stages["stub_requests"] = stub.requests - requests_before
+    return stages
+
+
+def compare(results, baseline_path):
+    '''Print each stage's median against a previous results file'''
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"Compared with {baseline_path} (commit {baseline.get('commit')}):")
+    if baseline.get("scale") != results["scale"]:
+        print(f"  Note: the runs used different scales ({baseline.get('scale')} vs {results['scale']})")
+    for name, result in results["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if isinstance(result, dict) and isinstance(before, dict) and before["median_ms"]:
+            ratio = result["median_ms"] / before["median_ms"]
+            print(f"  {name:<22} {before['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000, help="Violation rows (10k to 50M)")
+    parser.add_argument('--streets', type=int, default=500)
+    parser.add_argument('--blocks', type=int, default=20, help="Blocks per street")
+    parser.add_argument('--visits', type=int, default=50, help="Sweep visits per segment")
+    parser.add_argument('--borough', default='2')
+    parser.add_argument('--queries', type=int, default=200, help="Lookups per stage")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every stub response")
+    parser.add_argument('--workdir', help="Directory for generated data and caches (default: a temporary one)")
+    parser.add_argument('--output', help="Write the results JSON here")
+    parser.add_argument('--compare', help="Results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    workdir = args.workdir or tempfile.mkdtemp(prefix='sweep_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)  # Every cache path in config is relative, so the run leaves the project's cache alone
+
+    data_path = os.path.join(workdir, 'csvs')
+    start = time.perf_counter()
+    synthetic.write_borough_csv(data_path, args.borough, args.rows, args.streets, args.blocks)
+    stub, centerline, sweeps = start_stub(args.borough, args.streets, args.blocks, args.visits, args.latency)
+    print(f"Generated {args.rows:,} violations, {len(centerline):,} segments and {len(sweeps):,} sweep visits "
+          f"in {time.perf_counter() - start:.1f}s; stub at {stub.domain}")
+
+    config.SOCRATA_DOMAIN = stub.domain
+    config.SOCRATA_URI_PREFIX = "http://"
+    config.SOCRATA_CACHE_ENABLED = False  # Time the requests, not the response cache
+    try:
+        stages = run_stages(args, data_path, stub, centerline, sweeps)
+    finally:
+        stub.stop()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scale": {
+            "rows": args.rows, "streets": args.streets, "blocks": args.blocks, "visits": args.visits,
+            "queries": args.queries, "repeat": args.repeat, "latency": args.latency,
+        },
+        "stages": stages,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {output}")
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
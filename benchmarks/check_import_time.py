@@ -0,0 +1,114 @@
+"""Import time regression check for the sweepinsights CLI, using python -X importtime.
+
+Runs `sweepinsights.py --help` and cache-only lookups of a cached and an uncached address in a
+scratch directory and fails (exit status 1) if any of them imports a heavy module (pandas, NumPy, the HTTP and geocoding
+clients, plotting) or spends more than the budget importing modules beyond what a bare
+interpreter imports.
+
+Run from the project root:
+    python -m benchmarks.check_import_time --budget-ms 50
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from config import ADDRESS_CACHE_DB, BLOCK_RISK_DB
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CLI = PROJECT_ROOT / 'sweepinsights.py'
+
+# Modules the fast paths must not import
+HEAVY_MODULES = ('pandas', 'numpy', 'sodapy', 'geopy', 'requests', 'matplotlib', 'seaborn')
+
+# (name, CLI arguments, expected exit status); the hit is answered from the caches seeded by seed_caches
+CHECKS = [
+    ("help", ['--help'], 0),
+    ("cache-only lookup (hit)", ['lookup', 'Valentine Ave', '2025', '--borough', '2', '--cache-only'], 0),
+    ("cache-only lookup (miss)", ['lookup', 'Grand Concourse', '1000', '--borough', '2', '--cache-only'], 1),
+]
+
+# Precomputed block side holding the cached address
+SEED_PHYSICAL_ID = '100001'
+SEED_BLOCK = {
+    'physical_id': SEED_PHYSICAL_ID, 'side': 'L', 'borough_code': '2', 'street_name': 'VALENTINE AVE',
+    'low_hn': '2001', 'high_hn': '2099', 'sweep_samples': 100,
+    'most_common_interval': '09:00-09:30', 'most_common_percentage': 60.0,
+    'second_most_common_interval': '09:30-10:00', 'second_most_common_percentage': 30.0,
+    'recent_sweep_time': '09:12:00', 'total_violations': 50, 'violations_after_sweep': 5,
+    'likelihood_percentage': 10.0, 'likelihood_percentage_optimal': 4.0, 'likelihood_percentage_ten_minutes': 2.0,
+    'likelihood_score': 'Low', 'likelihood_score_optimal': 'Low', 'likelihood_score_ten_minutes': 'Low',
+}
+
+
+def import_times(args, cwd):
+    """
+    Run a Python command under -X importtime.
+
+    Args:
+        args (list): Arguments after `python -X importtime`.
+        cwd (str): Working directory.
+
+    Returns:
+        tuple: (exit status, list of (module, cumulative microseconds, nesting depth) per imported module).
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=cwd, capture_output=True, text=True)
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        modules.append((name.strip(), int(cumulative), depth))
+    return completed.returncode, modules
+
+
+def seed_caches(cwd):
+    '''Cache the hit address's physical_id and precompute its block in cwd, where the CLI's relative cache paths resolve'''
+    from data.address_mapper import AddressMapper
+    from data.block_risk import BlockRiskTable
+
+    mapper = AddressMapper(db_file=str(Path(cwd) / ADDRESS_CACHE_DB))
+    mapper.cache_physical_ids([('Valentine Ave', '2025', SEED_PHYSICAL_ID, '2')])
+    BlockRiskTable(db_file=str(Path(cwd) / BLOCK_RISK_DB)).replace_borough('2', [SEED_BLOCK])
+
+
+def check(name, cli_args, expected_status, cwd, startup_modules, budget_ms):
+    '''Print a report for one command; returns True if it exits as expected, is within the budget and imports nothing heavy'''
+    status, modules = import_times([str(CLI), *cli_args], cwd)
+    imported = {module for module, _, _ in modules}
+    heavy = sorted(imported.intersection(HEAVY_MODULES))
+
+    # Top-level imports (depth 0) the bare interpreter doesn't make are the CLI's own cost
+    own = [(module, micros) for module, micros, depth in modules if depth == 0 and module not in startup_modules]
+    total_ms = sum(micros for _, micros in own) / 1000
+
+    ok = status == expected_status and not heavy and total_ms <= budget_ms
+    print(f"{'ok  ' if ok else 'FAIL'} {name}: {total_ms:.1f} ms of imports (budget {budget_ms:.0f} ms), {len(imported)} modules")
+    for module, micros in sorted(own, key=lambda item: -item[1])[:5]:
+        print(f"       {micros / 1000:7.1f} ms  {module}")
+    if heavy:
+        print(f"       heavy modules imported: {', '.join(heavy)}")
+    if status != expected_status:
+        print(f"       exited with status {status}, expected {expected_status}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=50.0, help="Import time allowed per command")
+    args = parser.parse_args()
+
+    # A scratch directory holding only the seeded caches: relative cache paths resolve there
+    with tempfile.TemporaryDirectory(prefix='sweep_importtime_') as cwd:
+        seed_caches(cwd)
+        startup_modules = {module for module, _, _ in import_times(['-c', 'pass'], cwd)[1]}
+        results = [
+            check(name, cli_args, expected_status, cwd, startup_modules, args.budget_ms)
+            for name, cli_args, expected_status in CHECKS
+        ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Local Socrata-compatible stub serving in-memory datasets at /resource/<dataset id>.json.
+
+Understands the part of SoQL the data modules send: $select (column list), $where made of
+AND-ed `column = 'x'`, `column IN ('x', ...)` and `column >|>=|<|<=|!= 'x'` terms (optionally
+parenthesized), $order (columns with ASC/DESC), $limit and $offset. Equality and IN terms on
+indexed columns are answered from a hash index instead of a scan.
+
+Point the code at it by setting, before the data modules are imported:
+    config.SOCRATA_DOMAIN = f"127.0.0.1:{port}"
+    config.SOCRATA_URI_PREFIX = "http://"
+"""
+import json
+import operator
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+_COMPARISONS = {
+    '=': operator.eq, '!=': operator.ne,
+    '>': operator.gt, '>=': operator.ge,
+    '<': operator.lt, '<=': operator.le,
+}
+_COMPARISON_RE = re.compile(r"^(\w+)\s*(>=|<=|!=|=|>|<)\s*'((?:[^']|'')*)'$")
+_IN_RE = re.compile(r"^(\w+)\s+IN\s*\((.*)\)$", re.IGNORECASE | re.DOTALL)
+_LITERAL_RE = re.compile(r"'((?:[^']|'')*)'")
+_AND_RE = re.compile(r"\s+AND\s+", re.IGNORECASE)
+
+
+class SoqlError(ValueError):
+    '''A query the stub does not understand'''
+
+
+def _split_and(where):
+    '''Split a $where clause at top-level ANDs (outside quotes and parentheses)'''
+    terms, depth, quoted, start, i = [], 0, False, 0, 0
+    while i < len(where):
+        char = where[i]
+        if char == "'":
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0:
+            match = _AND_RE.match(where, i)
+            if match:
+                terms.append(where[start:i])
+                start = i = match.end()
+                continue
+        i += 1
+    terms.append(where[start:])
+
+    result = []
+    for term in terms:
+        term = term.strip()
+        if term.startswith('(') and term.endswith(')') and not _IN_RE.match(term):
+            result.extend(_split_and(term[1:-1]))  # Parenthesized group of AND-ed terms
+        else:
+            result.append(term)
+    return result
+
+
+def _parse_term(term):
+    '''(column, op, value) for a comparison, or (column, 'in', set of values)'''
+    match = _IN_RE.match(term)
+    if match:
+        values = {value.replace("''", "'") for value in _LITERAL_RE.findall(match.group(2))}
+        return match.group(1), 'in', values
+    match = _COMPARISON_RE.match(term)
+    if match:
+        return match.group(1), match.group(2), match.group(3).replace("''", "'")
+    raise SoqlError(f"Unsupported $where term: {term}")
+
+
+class StubDataset:
+    '''Rows of one dataset plus hash indexes on the columns queried by equality'''
+
+    def __init__(self, rows, index_columns=()):
+        self.rows = rows
+        self.indexes = {}
+        for column in index_columns:
+            index = {}
+            for position, row in enumerate(rows):
+                index.setdefault(row.get(column), []).append(position)
+            self.indexes[column] = index
+
+    def query(self, where=None, select=None, order=None, limit=1000, offset=0):
+        '''Rows matching a SoQL query, as a list of dictionaries'''
+        terms = [_parse_term(term) for term in _split_and(where)] if where else []
+
+        # Narrow the candidates with an index when a term allows it, then check every term
+        candidates = None
+        for column, op, value in terms:
+            if column in self.indexes and op in ('=', 'in'):
+                index = self.indexes[column]
+                values = value if op == 'in' else (value,)
+                positions = sorted(p for v in values for p in index.get(v, ()))
+                candidates = [self.rows[p] for p in positions]
+                break
+        if candidates is None:
+            candidates = self.rows
+
+        def matches(row):
+            for column, op, value in terms:
+                field = row.get(column)
+                if op == 'in':
+                    if field not in value:
+                        return False
+                elif field is None or not _COMPARISONS[op](field, value):
+                    return False
+            return True
+
+        rows = [row for row in candidates if matches(row)]
+
+        if order:
+            # Stable sorts from the last key to the first
+            for part in reversed([part.split() for part in order.split(',')]):
+                rows.sort(key=lambda row: row.get(part[0]) or '', reverse=len(part) > 1 and part[1].upper() == 'DESC')
+
+        rows = rows[offset:offset + limit]
+        if select:
+            columns = [column.strip() for column in select.split(',')]
+            rows = [{column: row[column] for column in columns if column in row} for row in rows]
+        return rows
+
+
+class SocrataStub:
+    '''Threaded HTTP server answering Socrata resource queries from StubDatasets'''
+
+    def __init__(self, datasets, host='127.0.0.1', port=0, latency=0.0):
+        """
+        Initialize the SocrataStub.
+
+        Args:
+            datasets (dict): Dataset id -> StubDataset.
+            host (str): Interface to bind.
+            port (int): Port to listen on (0 picks a free one).
+            latency (float): Seconds added to every response, to imitate the network.
+        """
+        self.datasets = datasets
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def domain(self):
+        '''host:port to use as SOCRATA_DOMAIN'''
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, code, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                url = urlparse(self.path)
+                match = re.match(r'^/resource/([\w-]+)\.json$', url.path)
+                dataset = stub.datasets.get(match.group(1)) if match else None
+                if dataset is None:
+                    self._send(404, {"error": True, "message": f"No dataset at {url.path}"})
+                    return
+
+                params = {name: values[0] for name, values in parse_qs(url.query).items()}
+                try:
+                    rows = dataset.query(
+                        where=params.get('$where'),
+                        select=params.get('$select'),
+                        order=params.get('$order'),
+                        limit=int(params.get('$limit', 1000)),
+                        offset=int(params.get('$offset', 0))
+                    )
+                except SoqlError as e:
+                    self._send(400, {"error": True, "message": str(e)})
+                    return
+                if stub.latency:
+                    threading.Event().wait(stub.latency)
+                self._send(200, rows)
+
+        return Handler
+
+    def start(self):
+        '''Serve on a background thread; returns self'''
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,154 @@
+"""Synthetic borough violation CSVs, street centerline segments and sweep histories for benchmarks.
+
+Every borough gets `num_streets` streets ("SYNTH 12 AVE") of `blocks_per_street` blocks each;
+block b of a street covers house numbers b*100+1..b*100+99 on the left (odd) side and
+b*100..b*100+98 on the right (even) side, so violations, centerline and sweeps line up.
+
+Generate files from the project root:
+    python -m benchmarks.synthetic out_dir --rows 1000000 --boroughs 2
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from config import BOROUGH_CODES
+
+CSV_CHUNK_ROWS = 1_000_000  # Rows generated and written at a time, so 50M-row files fit in memory
+VIOLATION_CODES = np.array([21, 21, 21, 14, 38, 40, 71])  # Mostly street cleaning
+
+
+def street_name(street):
+    '''Synthetic street name for a street number'''
+    return f"SYNTH {street} AVE"
+
+
+def borough_csv_name(borough_code):
+    '''File name load_csv_for_borough expects for a borough'''
+    borough_name = next(name for name, code in BOROUGH_CODES.items() if code == str(borough_code))
+    return f"{borough_name.lower().replace(' ', '')}StreetCleaningViolations.csv"
+
+
+def physical_id(borough_code, street, block):
+    '''Unique physical_id of a street block'''
+    return f"{borough_code}{street:05d}{block:03d}"
+
+
+def _violation_times(minutes):
+    '''Minutes of day as raw 'HHMMA' / 'HHMMP' violation times'''
+    hours = (minutes // 60) % 12
+    hours = np.where(hours == 0, 12, hours)
+    period = np.where(minutes >= 720, 'P', 'A')
+    return np.char.add(np.char.add(np.char.zfill(hours.astype(str), 2), np.char.zfill((minutes % 60).astype(str), 2)), period)
+
+
+def violation_chunk(rows, borough_code, num_streets, blocks_per_street, rng):
+    """
+    Generate one chunk of violation rows with the columns of the borough CSVs.
+
+    Args:
+        rows (int): Number of rows.
+        borough_code (str): Borough code written to 'Violation County'.
+        num_streets (int): Streets in the borough.
+        blocks_per_street (int): Blocks per street.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        pd.DataFrame: The rows.
+    """
+    streets = np.array([street_name(i) for i in range(num_streets)], dtype=object)
+    house_numbers = rng.integers(1, blocks_per_street * 100, rows)
+    # Tickets cluster in the morning around street cleaning, with a tail through the day
+    minutes = np.clip(rng.normal(600, 120, rows).astype(np.int64), 0, 24 * 60 - 1)
+    days = rng.integers(0, 366, rows).astype('timedelta64[D]') + np.datetime64('2024-01-01')
+
+    return pd.DataFrame({
+        'Street Name': streets[rng.integers(0, num_streets, rows)],
+        'House Number': house_numbers.astype(str),
+        'Violation Code': rng.choice(VIOLATION_CODES, rows),
+        'Issue Date': pd.to_datetime(days).strftime('%m/%d/%Y'),
+        'Violation Time': _violation_times(minutes),
+        'Violation County': str(borough_code),
+    })
+
+
+def write_borough_csv(data_path, borough_code, rows, num_streets, blocks_per_street, seed=0):
+    """
+    Write a synthetic violations CSV for a borough, chunk by chunk.
+
+    Args:
+        data_path (str): Output directory.
+        borough_code (str): Borough code (1-5).
+        rows (int): Number of violation rows.
+        num_streets (int): Streets in the borough.
+        blocks_per_street (int): Blocks per street.
+        seed (int): Random seed.
+
+    Returns:
+        str: Path of the written CSV.
+    """
+    os.makedirs(data_path, exist_ok=True)
+    csv_path = os.path.join(data_path, borough_csv_name(borough_code))
+    rng = np.random.default_rng(seed + int(borough_code))
+    with open(csv_path, 'w', newline='') as f:
+        for start in range(0, max(rows, 1), CSV_CHUNK_ROWS):
+            chunk = violation_chunk(min(CSV_CHUNK_ROWS, rows - start), borough_code, num_streets, blocks_per_street, rng)
+            chunk.to_csv(f, index=False, header=start == 0)
+    return csv_path
+
+
+def centerline_records(borough_code, num_streets, blocks_per_street):
+    '''Street centerline records (inkn-q76z fields) for every block of a borough'''
+    records = []
+    for street in range(num_streets):
+        for block in range(blocks_per_street):
+            low = block * 100
+            records.append({
+                "physicalid": physical_id(borough_code, street, block),
+                "full_street_name": street_name(street),
+                "l_low_hn": str(low + 1),
+                "l_high_hn": str(low + 99),
+                "r_low_hn": str(low),
+                "r_high_hn": str(low + 98),
+                "boroughcode": str(borough_code),
+            })
+    return records
+
+
+def sweep_records(physical_ids, visits_per_segment, seed=0):
+    """
+    Sweep visit records (c23c-uwsm fields), daily visits clustered around each segment's usual time.
+
+    Args:
+        physical_ids (list): Segments to generate visits for.
+        visits_per_segment (int): Visits per segment.
+        seed (int): Random seed.
+
+    Returns:
+        list: {"physical_id", "date_visited"} dictionaries.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.repeat(np.asarray(physical_ids, dtype=object), visits_per_segment)
+    usual_minute = np.repeat(rng.integers(7 * 60, 12 * 60, len(physical_ids)), visits_per_segment)
+    minutes = np.clip(usual_minute + rng.normal(0, 15, len(ids)).astype(np.int64), 0, 24 * 60 - 1)
+    days = np.tile(np.arange(visits_per_segment), len(physical_ids)).astype('timedelta64[D]') + np.datetime64('2024-01-01')
+    visited = days.astype('datetime64[m]') + minutes.astype('timedelta64[m]')
+    stamps = np.char.add(np.datetime_as_string(visited, unit='s'), '.000')
+    return [{"physical_id": pid, "date_visited": stamp} for pid, stamp in zip(ids, stamps.tolist())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic borough violation CSVs")
+    parser.add_argument('data_path')
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Violation rows per borough")
+    parser.add_argument('--boroughs', default='2', help="Comma-separated borough codes")
+    parser.add_argument('--streets', type=int, default=2000)
+    parser.add_argument('--blocks', type=int, default=20, help="Blocks per street")
+    args = parser.parse_args()
+
+    for borough_code in args.boroughs.split(','):
+        path = write_borough_csv(args.data_path, borough_code, args.rows, args.streets, args.blocks)
+        print(f"Wrote {args.rows:,} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
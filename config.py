@@ -6,6 +6,12 @@
 # Socrata API Configuration
 SOCRATA_DOMAIN = "data.cityofnewyork.us"
 SOCRATA_APP_TOKEN = "9w7K6nm2xXI9j3d4n59R250Jj" # Get free token at: https://data.cityofnewyork.us/profile/app_tokens
+SOCRATA_URI_PREFIX = "https://"  # Use "http://" to point SOCRATA_DOMAIN at a local fake server
+
+# Geocoding and SweepNYC endpoints
+NOMINATIM_DOMAIN = "nominatim.openstreetmap.org"
+NOMINATIM_SCHEME = "https"
+SWEEPNYC_API_URL = "https://sweepnyc.nyc.gov/mappingapi/api/highlight/sweepinfo"
 
 # Dataset IDs
 DATASET_IDS = {
@@ -25,5 +31,91 @@ BOROUGH_CODES = {
 }
 
 # Cache settings
-CACHE_FILE = 'cache/address_cache.json'
+CACHE_FILE = 'cache/address_cache.json'  # Legacy JSON cache, imported into ADDRESS_CACHE_DB once
+ADDRESS_CACHE_DB = 'cache/address_cache.sqlite3'
+ADDRESS_CACHE_LRU_SIZE = 10000  # Mappings kept in memory in front of the database
+ADDRESS_CACHE_BATCH_SIZE = 100  # New mappings buffered before they are written
 ENABLE_CACHE = True
+
+# Columnar violation store settings
+VIOLATION_STORE_DIR = 'cache/violations'
+VIOLATION_COLUMNS = ['Street Name', 'Violation Code', 'House Number', 'Issue Date', 'Violation Time']
+
+# Chunked reads of large violation CSVs (e.g. the citywide file): dtypes given up front and rows per chunk
+VIOLATION_CSV_DTYPES = {
+    'Street Name': str,
+    'House Number': str,
+    'Violation Code': 'Int16',
+    'Issue Date': str,
+    'Violation Time': str,
+    'Violation County': str,
+}
+VIOLATION_CHUNK_ROWS = 200000
+
+# Memory budget for loaded borough DataFrames shared across the process (bytes)
+FRAME_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Width of the sweep time histogram bins (minutes; must divide a day, e.g. 5, 10, 15 or 30)
+SWEEP_BIN_MINUTES = 30
+
+# Batch settings: worker threads for fetch_ticket_analysis_for_addresses and
+# the maximum number of requests in flight to each external service
+BATCH_WORKERS = 8
+SERVICE_CONCURRENCY = {
+    'nominatim': 1,
+    'sweepnyc': 4,
+    'socrata': 8,
+}
+
+# Longest SoQL $where clause sent in one request (keeps IN (...) lists under URL limits)
+SOCRATA_MAX_WHERE_CHARS = 4000
+
+# Local mirror of the street centerline dataset (filled by python -m data.centerline_store)
+CENTERLINE_STORE_DIR = 'cache/centerline'
+
+# On-disk cache of Socrata responses
+SOCRATA_CACHE_ENABLED = True
+SOCRATA_CACHE_FILE = 'cache/socrata_cache.sqlite3'
+SOCRATA_CACHE_VERSION = 1  # Bump to ignore every response cached so far
+SOCRATA_CACHE_MAX_BYTES = 512 * 1024 ** 2
+SOCRATA_CACHE_DEFAULT_TTL = 24 * 3600  # Seconds
+SOCRATA_CACHE_TTLS = {
+    'inkn-q76z': 30 * 24 * 3600,  # Street centerline rarely changes
+    'c23c-uwsm': 3600,  # Sweep visits are added throughout the day
+}
+
+# Geocoding: persistent cache of Nominatim results and the request rate allowed by its usage policy
+GEOCODE_CACHE_DB = 'cache/geocode_cache.sqlite3'
+NOMINATIM_REQUESTS_PER_SECOND = 1.0
+GEOCODE_RETRIES = 2
+GEOCODE_NEGATIVE_TTL = 24 * 3600  # Seconds an address Nominatim could not find is remembered
+
+# SweepNYC sign rules cached per street and geohash cell (precision 7 is roughly a 150 m square)
+SIGN_RULES_CACHE_DB = 'cache/sign_rules_cache.sqlite3'
+SIGN_RULES_GEOHASH_PRECISION = 7
+SIGN_RULES_CACHE_TTL = 7 * 24 * 3600  # Seconds
+
+# Local sweep history; a segment is re-synced (visits newer than its watermark only) once it is older than this
+SWEEP_STORE_DB = 'cache/sweep_store.sqlite3'
+SWEEP_STORE_MAX_AGE = 3600  # Seconds
+
+# Precomputed block risk table (built by python -m data.block_risk_job) and the processes used to build it;
+# rows older than BLOCK_RISK_MAX_AGE are ignored and the address is analyzed live
+BLOCK_RISK_DB = 'cache/block_risk.sqlite3'
+BLOCK_RISK_WORKERS = 5
+BLOCK_RISK_MAX_AGE = 2 * 24 * 3600  # Seconds
+
+# Local query service (python service.py); latency percentiles cover the last SERVICE_LATENCY_WINDOW requests per endpoint
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8080
+SERVICE_LATENCY_WINDOW = 10000
+
+# Transport for Socrata, Nominatim and SweepNYC requests: 'live', 'record' (live, saving every response to the archive)
+# or 'replay' (answered from the archive only, each after TRANSPORT_REPLAY_LATENCY seconds)
+TRANSPORT_MODE = 'live'
+TRANSPORT_ARCHIVE = 'cache/transport_archive.sqlite3'
+TRANSPORT_REPLAY_LATENCY = 0.0  # Seconds
+
+# Span timings and counters (data.instrumentation); off by default, when every hook returns immediately
+INSTRUMENTATION_ENABLED = False
+SPAN_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0]  # Seconds
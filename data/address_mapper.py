@@ -1,58 +1,144 @@
+import atexit
 import json
 import os
+import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from config import CACHE_FILE, ENABLE_CACHE
+from config import CACHE_FILE, ADDRESS_CACHE_DB, ADDRESS_CACHE_LRU_SIZE, ADDRESS_CACHE_BATCH_SIZE, ENABLE_CACHE
+from .street_names import canonical_street_name
+from .house_numbers import canonical_house_number
+from .instrumentation import count
+
 
 class AddressMapper:
     '''Manages address to physical_id mapping with caching'''
-    
-    def __init__(self):
-        self.cache = self._load_cache()
-    
-    def _load_cache(self):
-        '''Load cached address mappings'''
+
+    def __init__(self, db_file=ADDRESS_CACHE_DB, lru_size=ADDRESS_CACHE_LRU_SIZE, batch_size=ADDRESS_CACHE_BATCH_SIZE):
+        self.db_file = db_file
+        self.lru_size = lru_size
+        self.batch_size = batch_size
+        self.lru = OrderedDict()  # Recently used key -> physical_id
+        self.pending = {}  # New mappings not written to the database yet
+        self._lock = threading.RLock()  # Trackers on different threads can share one mapper
+        self._conn = self._open_db()
+        atexit.register(self.flush)
+
+    def _open_db(self):
+        '''Open (and create) the SQLite cache; WAL mode lets several processes share it'''
         if not ENABLE_CACHE:
-            return {}
-        
+            return None
+
         try:
-            if os.path.exists(CACHE_FILE):
-                with open(CACHE_FILE, 'r') as f:
-                    return json.load(f)
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS addresses (key TEXT PRIMARY KEY, physical_id TEXT NOT NULL)")
+            conn.commit()
+            self._import_json_cache(conn)
+            return conn
         except Exception as e:
-            print(f"Error loading cache: {e}")
-        
-        return {}
-    
-    def _save_cache(self):
-        '''Save cache to file'''
-        if not ENABLE_CACHE:
+            print(f"Error opening cache: {e}")
+            return None
+
+    def _import_json_cache(self, conn):
+        '''Move mappings from the old address_cache.json into the database, once'''
+        if not os.path.exists(CACHE_FILE):
             return
-        
+
         try:
-            # Create cache directory if it doesn't exist
-            Path(CACHE_FILE).parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(CACHE_FILE, 'w') as f:
-                json.dump(self.cache, f, indent=2)
+            with open(CACHE_FILE, 'r') as f:
+                old_cache = json.load(f)
+            rows = []
+            for old_key, physical_id in old_cache.items():
+                # Old keys look like "2025_VALENTINE AVE_2"
+                house_number, rest = old_key.split('_', 1)
+                street_name, borough_code = rest.rsplit('_', 1)
+                rows.append((self._make_cache_key(street_name, house_number, borough_code), physical_id))
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO addresses (key, physical_id) VALUES (?, ?)", rows)
+            os.replace(CACHE_FILE, f"{CACHE_FILE}.imported")
+            print(f"Imported {len(rows)} cached addresses from {CACHE_FILE}")
         except Exception as e:
-            print(f"Error saving cache: {e}")
-    
+            print(f"Error importing cache: {e}")
+
     def _make_cache_key(self, street_name, house_number, borough_code=None):
-        '''Create cache key from address components'''
-        return f"{house_number}_{street_name.upper()}_{borough_code or ''}"
-    
+        '''Create a normalized cache key, so "Valentine Ave"/"VALENTINE AVENUE", "94 - 16"/"94-16" and 2/'2' share an entry'''
+        house_number = canonical_house_number(house_number)
+        borough_code = str(borough_code).strip() if borough_code not in (None, '') else ''
+        return f"{house_number}_{canonical_street_name(street_name)}_{borough_code}"
+
+    def _remember(self, key, physical_id):
+        '''Put a mapping in the in-memory LRU (caller holds the lock)'''
+        self.lru[key] = physical_id
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
     def get_cached_physical_id(self, street_name, house_number, borough_code=None):
         '''Look up physical_id from cache'''
+        physical_id = self._lookup(street_name, house_number, borough_code)
+        count('cache_hits' if physical_id is not None else 'cache_misses', cache='address')
+        return physical_id
+
+    def _lookup(self, street_name, house_number, borough_code):
+        '''physical_id from the LRU, the pending writes or the database, or None'''
         key = self._make_cache_key(street_name, house_number, borough_code)
-        return self.cache.get(key)
-    
+        with self._lock:
+            if key in self.lru:
+                self.lru.move_to_end(key)
+                return self.lru[key]
+            if key in self.pending:
+                return self.pending[key]
+            if self._conn is None:
+                return None
+
+            row = self._conn.execute("SELECT physical_id FROM addresses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
     def cache_physical_id(self, street_name, house_number, physical_id, borough_code=None):
-        '''Store physical_id in cache'''
+        '''Store physical_id in cache (written to the database in batches)'''
         key = self._make_cache_key(street_name, house_number, borough_code)
-        self.cache[key] = physical_id
-        self._save_cache()
-    
+        with self._lock:
+            self._remember(key, physical_id)
+            self.pending[key] = physical_id
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def cache_physical_ids(self, entries):
+        '''Store many (street_name, house_number, physical_id, borough_code) entries with a single write'''
+        with self._lock:
+            for street_name, house_number, physical_id, borough_code in entries:
+                key = self._make_cache_key(street_name, house_number, borough_code)
+                self._remember(key, physical_id)
+                self.pending[key] = physical_id
+            self.flush()
+
+    def flush(self):
+        '''Write buffered mappings to the database in one transaction'''
+        with self._lock:
+            if not self.pending or self._conn is None:
+                self.pending.clear()
+                return
+
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO addresses (key, physical_id) VALUES (?, ?)",
+                        list(self.pending.items())
+                    )
+                self.pending.clear()
+            except Exception as e:
+                print(f"Error saving cache: {e}")
+
     def clear_cache(self):
         '''Clear all cached mappings'''
-        self.cache = {}
-        self._save_cache()
\ No newline at end of file
+        with self._lock:
+            self.lru.clear()
+            self.pending.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM addresses")
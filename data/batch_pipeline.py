@@ -0,0 +1,43 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import BATCH_WORKERS
+
+
+def _describe(address):
+    '''Readable form of an address dictionary for error reports'''
+    return f"{address.get('house_number', '')} {address.get('street_name', '')}".strip()
+
+
+def run_batch(addresses, analyze, tracker_factory, workers=BATCH_WORKERS):
+    """
+    Analyze many addresses concurrently, one SweepTracker per worker thread.
+
+    Trackers keep per-request state (current block, loaded violations), so each worker
+    thread gets its own from tracker_factory. Requests to external services are bounded
+    separately by the per-service limits in data.service_limits.
+
+    Args:
+        addresses (list): Address dictionaries (street_name, house_number, borough_code).
+        analyze (callable): analyze(tracker, address) -> result dictionary.
+        tracker_factory (callable): Returns a new SweepTracker.
+        workers (int): Number of worker threads.
+
+    Returns:
+        list: One result per address, in input order. An address that raised gets
+        {"status": "error", "address": ..., "message": ...}.
+    """
+    local = threading.local()
+
+    def run_one(address):
+        if not hasattr(local, 'tracker'):
+            local.tracker = tracker_factory()
+        try:
+            return analyze(local.tracker, address)
+        except Exception as e:
+            return {"status": "error", "address": _describe(address), "message": str(e)}
+
+    if workers <= 1:
+        return [run_one(address) for address in addresses]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sweep-batch") as executor:
+        return list(executor.map(run_one, addresses))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from .street_names import canonical_street_name
+from .house_numbers import house_number_key, house_number_keys
+from .instrumentation import count
+
+
+class BlockIndex:
+    '''Borough violations sorted by (street, violation code, house number) for block lookups'''
+
+    def __init__(self, frame):
+        """
+        Sort a borough violations frame once so block queries become binary searches.
+
+        Args:
+            frame (pd.DataFrame): Violations with 'Street Name', 'Violation Code' and 'House Number'.
+        """
+        if frame.empty:
+            self.frame = frame
+            self.streets = np.array([], dtype=object)
+            self.group_keys = np.array([], dtype=np.int64)
+            self.house_keys = np.array([], dtype=np.int64)
+            return
+
+        # Canonicalize each distinct street name once, so centerline and violation spellings match
+        # ("VALENTINE AVENUE" and "VALENTINE AV" both become "VALENTINE AVE"), then give every row a sorted street id
+        street_codes, street_values = pd.factorize(frame['Street Name'])
+        canonical = np.array([canonical_street_name(name) for name in street_values], dtype=object)
+        self.streets, street_ids = np.unique(canonical, return_inverse=True)
+        street_ids = np.append(street_ids, -1)[street_codes]  # code -1 (missing) -> -1
+
+        violation_codes = pd.to_numeric(frame['Violation Code'], errors='coerce')
+        violation_codes = violation_codes.fillna(-1).to_numpy(dtype=np.int64)
+        if 'House Key' in frame:
+            house_keys = frame['House Key'].to_numpy(dtype=np.int64)
+        else:
+            house_keys = house_number_keys(frame['House Number'])
+
+        order = np.lexsort((house_keys, violation_codes, street_ids))
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self.group_keys = self._group_key(street_ids[order], violation_codes[order])
+        self.house_keys = house_keys[order]
+
+    @staticmethod
+    def _group_key(street_ids, violation_codes):
+        '''Combine street id and violation code into one monotonic int64 key'''
+        return ((np.asarray(street_ids, dtype=np.int64) + 1) << 32) | (np.asarray(violation_codes, dtype=np.int64) + 1)
+
+    @property
+    def nbytes(self):
+        '''Memory used by the sorted frame and the key arrays'''
+        return int(self.frame.memory_usage(deep=True).sum()) + self.group_keys.nbytes + self.house_keys.nbytes
+
+    def lookup(self, street_name, violation_code, block_range=None):
+        """
+        Return the violations for a street and violation code, optionally within a block.
+
+        Args:
+            street_name (str): Street name (matched by canonical_street_name).
+            violation_code (int): Violation code (e.g. 21 for street cleaning).
+            block_range (tuple, optional): (low, high) house numbers, inclusive.
+
+        Returns:
+            pd.DataFrame: Slice of the sorted frame (no rows are copied).
+        """
+        street = canonical_street_name(street_name)
+        street_id = np.searchsorted(self.streets, street)
+        if street_id >= len(self.streets) or self.streets[street_id] != street:
+            return self.frame.iloc[0:0]
+
+        group = self._group_key(street_id, int(violation_code))
+        start = np.searchsorted(self.group_keys, group, side='left')
+        end = np.searchsorted(self.group_keys, group, side='right')
+
+        if block_range:
+            low = house_number_key(block_range[0])
+            high = house_number_key(block_range[1])
+            if low is None or high is None:
+                return self.frame.iloc[0:0]
+            group_houses = self.house_keys[start:end]
+            start, end = (
+                start + np.searchsorted(group_houses, low, side='left'),
+                start + np.searchsorted(group_houses, high, side='right'),
+            )
+
+        count('rows_scanned', int(end - start), source='block_index')
+        return self.frame.iloc[start:end]
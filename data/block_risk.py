@@ -0,0 +1,157 @@
+import sqlite3
+import threading
+import time
+from datetime import time as time_of_day
+from pathlib import Path
+from config import BLOCK_RISK_DB, BLOCK_RISK_MAX_AGE
+from .instrumentation import count
+from .house_numbers import house_number_key
+
+# Same keys as the likelihood part of calculate_ticket_likelihood_after_sweep's result
+LIKELIHOOD_FIELDS = [
+    'total_violations', 'violations_after_sweep',
+    'likelihood_percentage', 'likelihood_percentage_optimal', 'likelihood_percentage_ten_minutes',
+    'likelihood_score', 'likelihood_score_optimal', 'likelihood_score_ten_minutes',
+]
+
+# Stored per (physical_id, side)
+BLOCK_RISK_FIELDS = [
+    'physical_id', 'side', 'borough_code', 'street_name', 'low_hn', 'high_hn',
+    'sweep_samples', 'most_common_interval', 'most_common_percentage',
+    'second_most_common_interval', 'second_most_common_percentage', 'recent_sweep_time',
+] + LIKELIHOOD_FIELDS + ['computed_at']
+
+
+class BlockRiskTable:
+    '''Precomputed sweep windows and ticket likelihoods per block side, read with one indexed query'''
+
+    def __init__(self, db_file=BLOCK_RISK_DB, max_age=BLOCK_RISK_MAX_AGE):
+        self.db_file = db_file
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        '''Open (and create) the SQLite database on first use'''
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS block_risk (
+                    physical_id TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    borough_code TEXT,
+                    street_name TEXT,
+                    low_hn TEXT,
+                    high_hn TEXT,
+                    sweep_samples INTEGER,
+                    most_common_interval TEXT,
+                    most_common_percentage REAL,
+                    second_most_common_interval TEXT,
+                    second_most_common_percentage REAL,
+                    recent_sweep_time TEXT,
+                    total_violations INTEGER,
+                    violations_after_sweep INTEGER,
+                    likelihood_percentage REAL,
+                    likelihood_percentage_optimal REAL,
+                    likelihood_percentage_ten_minutes REAL,
+                    likelihood_score TEXT,
+                    likelihood_score_optimal TEXT,
+                    likelihood_score_ten_minutes TEXT,
+                    computed_at REAL,
+                    PRIMARY KEY (physical_id, side)
+                ) WITHOUT ROWID
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS block_risk_borough ON block_risk (borough_code)")
+            self._conn.commit()
+        return self._conn
+
+    def is_built(self):
+        '''True if the table file exists (the batch job has run at least once)'''
+        return Path(self.db_file).exists()
+
+    def replace_borough(self, borough_code, rows):
+        """
+        Replace all rows of a borough in one transaction.
+
+        Args:
+            borough_code (str): Borough code (1-5).
+            rows (list): Dictionaries with the BLOCK_RISK_FIELDS keys.
+        """
+        now = time.time()
+        values = [tuple(now if field == 'computed_at' else row.get(field) for field in BLOCK_RISK_FIELDS) for row in rows]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM block_risk WHERE borough_code = ?", (str(borough_code),))
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO block_risk ({', '.join(BLOCK_RISK_FIELDS)}) "
+                    f"VALUES ({', '.join('?' * len(BLOCK_RISK_FIELDS))})",
+                    values
+                )
+
+    def get(self, physical_id, side):
+        '''Stored row for a block side as a dictionary, or None'''
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {', '.join(BLOCK_RISK_FIELDS)} FROM block_risk WHERE physical_id = ? AND side = ?",
+                (str(physical_id), side)
+            ).fetchone()
+        return dict(zip(BLOCK_RISK_FIELDS, row)) if row else None
+
+    def side_of(self, physical_id, house_number):
+        '''Side ('L' or 'R') of a segment whose stored house number range contains a house number, or None'''
+        key = house_number_key(house_number)
+        if key is None or not self.is_built():
+            return None
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT side, low_hn, high_hn FROM block_risk WHERE physical_id = ?", (str(physical_id),)
+            ).fetchall()
+        for side, low_hn, high_hn in rows:
+            low, high = house_number_key(low_hn), house_number_key(high_hn)
+            if low is not None and high is not None and low <= key <= high:
+                return side
+        return None
+
+    def lookup(self, physical_id, side, street_name=None, house_number=None):
+        """
+        Precomputed result for a block side, shaped like calculate_ticket_likelihood_after_sweep.
+
+        Args:
+            physical_id (str): Street segment physical ID.
+            side (str): 'L' or 'R'.
+            street_name (str, optional): Echoed in the result.
+            house_number (str, optional): Echoed in the result.
+
+        Returns:
+            dict or None: The result, or None if the block side has not been precomputed
+                or was computed more than max_age seconds ago.
+        """
+        if not self.is_built():
+            return None
+        row = self.get(physical_id, side)
+        if row is not None and time.time() - (row['computed_at'] or 0) > self.max_age:
+            row = None  # Stale: the caller falls back to the live analysis
+        count('cache_hits' if row is not None else 'cache_misses', cache='block_risk')
+        if row is None:
+            return None
+
+        if not row['total_violations']:
+            return {"status": "no_data", "message": "No parking violations found for this block.", "source": "block_risk"}
+
+        return {
+            "status": "success",
+            "street_name": street_name or row['street_name'],
+            "house_number": house_number,
+            # Stored as "HH:MM:SS"; the live path returns a datetime.time
+            "recent_sweep_time": time_of_day.fromisoformat(row['recent_sweep_time']) if row['recent_sweep_time'] else None,
+            "most_likely_interval": row['most_common_interval'],
+            **{field: row[field] for field in LIKELIHOOD_FIELDS},
+            "computed_at": row['computed_at'],
+            "source": "block_risk",
+        }
+
+
+block_risk_table = BlockRiskTable()
@@ -0,0 +1,132 @@
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from config import BOROUGH_CODES, BLOCK_RISK_WORKERS, SWEEP_BIN_MINUTES
+from data_analysis import ticket_likelihood
+from .data_fetcher import DataFetcher
+from .centerline_store import centerline_store
+from .sweep_store import sweep_store
+from .sweep_histogram import sweep_time_histograms
+from .block_risk import block_risk_table
+
+
+def compute_borough(borough_code, data_path, violation_code=21, sync_sweeps=False):
+    """
+    Compute the block risk rows of every segment side in one borough.
+
+    Uses the local centerline mirror, the sweep store and the borough's violation store,
+    so no network I/O happens unless sync_sweeps is set.
+
+    Args:
+        borough_code (str): Borough code (1-5).
+        data_path (str): Directory holding the borough violation CSVs.
+        violation_code (int): Violation code to score (default 21, street cleaning).
+        sync_sweeps (bool): First bring the sweep store up to date for the borough's segments.
+
+    Returns:
+        list: Row dictionaries for BlockRiskTable.replace_borough.
+    """
+    data_fetcher = DataFetcher(data_path=data_path)
+    blocks = centerline_store.block_sides(borough_code)
+    physical_ids = np.unique(blocks['physicalid'])
+    if sync_sweeps:
+        sweep_store.sync(data_fetcher, physical_ids)
+
+    # One histogram per segment from a single bincount over all of the borough's visits
+    ids, visits = sweep_store.visits(physical_ids)
+    histograms = sweep_time_histograms(ids, visits, bin_minutes=SWEEP_BIN_MINUTES)
+    first_visit = {}
+    for i, pid in enumerate(ids):
+        first_visit.setdefault(pid, i)  # visits are newest first within each segment
+
+    data_fetcher.load_csv_for_borough(borough_code)
+    block_index = data_fetcher.block_index
+    if block_index is None or data_fetcher.violations_data.empty:
+        print(f"No violation data for borough {borough_code}")
+        return []
+
+    rows = []
+    for pid, street, side, low_hn, high_hn in zip(
+        blocks['physicalid'], blocks['full_street_name'], blocks['side'], blocks['low_hn'], blocks['high_hn']
+    ):
+        histogram = histograms.get(pid)
+        if not histogram or histogram.get("status") != "success":
+            continue
+
+        recent_sweep = visits[first_visit[pid]].astype(object)  # datetime.datetime
+        violations = block_index.lookup(street, violation_code, block_range=(low_hn, high_hn))
+        violation_minutes = violations['Violation Minute'].to_numpy()
+
+        second = histogram.get("second_most_common") or {}
+        row = {
+            "physical_id": str(pid),
+            "side": str(side),
+            "borough_code": str(borough_code),
+            "street_name": str(street),
+            "low_hn": str(low_hn),
+            "high_hn": str(high_hn),
+            "sweep_samples": histogram["total_samples"],
+            "most_common_interval": histogram["most_common"]["interval"],
+            "most_common_percentage": histogram["most_common"]["percentage"],
+            "second_most_common_interval": second.get("interval"),
+            "second_most_common_percentage": second.get("percentage"),
+            "recent_sweep_time": recent_sweep.strftime("%H:%M:%S"),
+        }
+        if len(violation_minutes):
+            row.update(ticket_likelihood(violation_minutes, recent_sweep.hour * 60 + recent_sweep.minute, histogram))
+        else:
+            row["total_violations"] = 0
+        rows.append(row)
+    return rows
+
+
+def build_block_risk(data_path, borough_codes=None, workers=BLOCK_RISK_WORKERS, violation_code=21, sync_sweeps=False):
+    """
+    Build the block risk table, computing boroughs in parallel worker processes.
+
+    Args:
+        data_path (str): Directory holding the borough violation CSVs.
+        borough_codes (list, optional): Boroughs to build (default: all five).
+        workers (int): Worker processes.
+        violation_code (int): Violation code to score.
+        sync_sweeps (bool): Sync each borough's sweep history before computing.
+
+    Returns:
+        dict: borough_code -> number of rows written.
+    """
+    borough_codes = list(borough_codes or BOROUGH_CODES.values())
+    if not centerline_store.is_synced():
+        print("The street centerline mirror is required; run python -m data.centerline_store first.")
+        return {}
+
+    start = time.perf_counter()
+    written = {}
+    # Fresh interpreters rather than forks, so no SQLite handle is shared with a child
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(compute_borough, code, data_path, violation_code, sync_sweeps): code
+            for code in borough_codes
+        }
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"Error computing block risk for borough {code}: {e}")
+                continue
+            block_risk_table.replace_borough(code, rows)
+            written[code] = len(rows)
+            print(f"Wrote {len(rows)} block sides for borough {code}")
+
+    print(f"Built block risk for {len(written)} boroughs in {time.perf_counter() - start:.1f}s")
+    return written
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m data.block_risk_job <csv directory> [--sync-sweeps]")
+        sys.exit(1)
+    build_block_risk(sys.argv[1], sync_sweeps="--sync-sweeps" in sys.argv)
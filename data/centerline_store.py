@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from config import CENTERLINE_STORE_DIR, DATASET_IDS
+from .street_names import normalize_street_name
+from .house_numbers import house_number_key, house_number_keys
+from .socrata_reader import iter_column_chunks
+
+CENTERLINE_FIELDS = ['physicalid', 'full_street_name', 'boroughcode', 'l_low_hn', 'l_high_hn', 'r_low_hn', 'r_high_hn']
+
+
+class CenterlineStore:
+    '''Local copy of the street centerline dataset with a sorted house-range index per street'''
+
+    META_FILE = 'meta.json'
+    SYNC_PAGE_SIZE = 50000
+
+    def __init__(self, store_dir=CENTERLINE_STORE_DIR):
+        """
+        Initialize the CenterlineStore.
+
+        Args:
+            store_dir (str): Directory holding the downloaded centerline columns.
+        """
+        self.store_dir = Path(store_dir)
+        self.columns = None  # field -> np.ndarray, loaded on first lookup
+        self.groups = {}  # (borough code, street) -> (start, end) into the range arrays
+        self.street_boroughs = {}  # street -> borough codes it appears in
+        self._lock = threading.Lock()
+
+    def is_synced(self):
+        '''True if the centerline dataset has been downloaded'''
+        return (self.store_dir / self.META_FILE).exists()
+
+    def sync(self, data_fetcher):
+        """
+        Download the whole centerline dataset and write it to the store.
+
+        Args:
+            data_fetcher (DataFetcher): Fetcher whose Socrata client is used for the download.
+
+        Returns:
+            int: Number of segments stored.
+        """
+        # Read page by page into typed column chunks instead of holding every record as a dict.
+        # The response cache is skipped: it would replay an old download and fill up with pages.
+        chunks = {field: [] for field in CENTERLINE_FIELDS}
+        for chunk in iter_column_chunks(
+            data_fetcher.uncached_client,
+            DATASET_IDS['street_centerline'],
+            CENTERLINE_FIELDS,
+            order="physicalid",
+            page_size=self.SYNC_PAGE_SIZE
+        ):
+            for field, values in chunk.items():
+                chunks[field].append(values)
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        row_count = 0
+        for field in CENTERLINE_FIELDS:
+            field_chunks = chunks.pop(field)
+            values = np.concatenate(field_chunks) if field_chunks else np.array([], dtype=str)
+            np.save(self.store_dir / f"{field}.npy", values)
+            row_count = len(values)
+
+        meta = {"rows": row_count, "synced_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        tmp_path = self.store_dir / f"{self.META_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.store_dir / self.META_FILE)
+
+        with self._lock:
+            self.columns = None  # Rebuild the index from the new files on next lookup
+        print(f"Synced {row_count} street centerline segments into {self.store_dir}")
+        return row_count
+
+    def _load(self):
+        '''Load the stored columns and build the per-street range index'''
+        columns = {field: np.load(self.store_dir / f"{field}.npy", mmap_mode='r') for field in CENTERLINE_FIELDS}
+
+        # One range per (segment, side); sides without house numbers are dropped
+        segment_rows, sides, lows, highs = [], [], [], []
+        for side in ('L', 'R'):
+            low = house_number_keys(columns[f'{side.lower()}_low_hn'])
+            high = house_number_keys(columns[f'{side.lower()}_high_hn'])
+            valid = (low >= 0) & (high >= 0)
+            segment_rows.append(np.flatnonzero(valid))
+            sides.append(np.full(valid.sum(), side))
+            lows.append(np.minimum(low, high)[valid])
+            highs.append(np.maximum(low, high)[valid])
+        segment_rows = np.concatenate(segment_rows)
+        sides = np.concatenate(sides)
+        lows = np.concatenate(lows)
+        highs = np.concatenate(highs)
+
+        streets = np.array([normalize_street_name(s) for s in columns['full_street_name']], dtype=object)
+        group_names = np.char.add(np.char.add(np.asarray(columns['boroughcode'], dtype=str), '|'), streets.astype(str))
+        group_labels, group_ids = np.unique(group_names[segment_rows], return_inverse=True)
+
+        order = np.lexsort((lows, group_ids))
+        group_ids = group_ids[order]
+        self.segment_rows = segment_rows[order]
+        self.sides = sides[order]
+        self.lows = lows[order]
+        self.highs = highs[order]
+
+        # Running maximum of the high end within each street, so a lookup can stop
+        # walking back as soon as no earlier range can still reach the house number
+        offset = group_ids.astype(np.int64) << 40
+        self.max_highs = np.maximum.accumulate(self.highs + offset) - offset
+
+        starts = np.searchsorted(group_ids, np.arange(len(group_labels)), side='left')
+        ends = np.searchsorted(group_ids, np.arange(len(group_labels)), side='right')
+        self.groups = {
+            tuple(label.split('|', 1)): (int(start), int(end))
+            for label, start, end in zip(group_labels, starts, ends)
+        }
+        self.street_boroughs = {}
+        for borough, street in self.groups:
+            self.street_boroughs.setdefault(street, []).append(borough)
+        self.columns = columns
+
+    def _record(self, row):
+        '''Centerline record for a stored row, shaped like the Socrata response'''
+        return {field: str(self.columns[field][row]) for field in CENTERLINE_FIELDS}
+
+    def block_sides(self, borough_code=None):
+        """
+        Every (segment, side) with a house number range, for batch jobs.
+
+        Args:
+            borough_code (str, optional): Only return segments in this borough.
+
+        Returns:
+            dict: Arrays physicalid, full_street_name, boroughcode, side, low_hn and high_hn
+            (one entry per segment side).
+        """
+        with self._lock:
+            if self.columns is None:
+                self._load()
+
+        rows = self.segment_rows
+        keep = np.ones(len(rows), dtype=bool)
+        if borough_code:
+            keep = np.asarray(self.columns['boroughcode'], dtype=str)[rows] == str(borough_code)
+        rows, sides = rows[keep], self.sides[keep]
+
+        result = {field: np.asarray(self.columns[field], dtype=str)[rows] for field in ('physicalid', 'full_street_name', 'boroughcode')}
+        result['side'] = sides
+        for name in ('low_hn', 'high_hn'):
+            left = np.asarray(self.columns[f'l_{name}'], dtype=str)[rows]
+            right = np.asarray(self.columns[f'r_{name}'], dtype=str)[rows]
+            result[name] = np.where(sides == 'L', left, right)
+        return result
+
+    def lookup(self, full_street_name, house_number, borough_code=None):
+        """
+        Find the segment whose left or right house range contains an address, without network I/O.
+
+        Args:
+            full_street_name (str): Street name (e.g. "VALENTINE AVE").
+            house_number (str): House number (e.g. "2025" or "94-16").
+            borough_code (str, optional): Borough code (1-5); all boroughs are searched if omitted.
+
+        Returns:
+            tuple: (record, side) with side 'L' or 'R', or (None, None) if nothing matches.
+        """
+        with self._lock:
+            if self.columns is None:
+                self._load()
+
+        key = house_number_key(house_number)
+        if key is None:
+            return None, None
+
+        street = normalize_street_name(full_street_name)
+        if borough_code:
+            boroughs = [str(borough_code)]
+        else:
+            boroughs = self.street_boroughs.get(street, [])
+
+        for borough in boroughs:
+            bounds = self.groups.get((borough, street))
+            if bounds is None:
+                continue
+            start, end = bounds
+            # Ranges starting at or below the house number, walked back from the closest one
+            i = start + int(np.searchsorted(self.lows[start:end], key, side='right')) - 1
+            while i >= start and self.max_highs[i] >= key:
+                if self.highs[i] >= key:
+                    return self._record(self.segment_rows[i]), str(self.sides[i])
+                i -= 1
+        return None, None
+
+
+# Shared by every DataFetcher in the process so the index is built once
+centerline_store = CenterlineStore()
+
+
+if __name__ == "__main__":
+    from data.data_fetcher import DataFetcher
+
+    centerline_store.sync(DataFetcher(data_path=None))
@@ -1,10 +1,67 @@
 import os
+import requests
 from sodapy import Socrata
 import pandas as pd
-from config import SOCRATA_DOMAIN, SOCRATA_APP_TOKEN, DATASET_IDS, BOROUGH_CODES
+from config import SOCRATA_DOMAIN, SOCRATA_APP_TOKEN, SOCRATA_URI_PREFIX, DATASET_IDS, BOROUGH_CODES, VIOLATION_COLUMNS
+from config import SOCRATA_CACHE_ENABLED
+from .violation_store import ViolationStore
+from .violation_reader import read_violations_filtered
+from .frame_cache import borough_frame_cache, frame_nbytes
+from .violation_schema import apply_violation_schema
+from .block_index import BlockIndex
+from .street_names import normalize_street_name
+from .house_numbers import house_number_key, format_house_number, HYPHEN_SCALE, SUFFIX_SCALE
+from .centerline_store import centerline_store
+from .socrata_cache import CachedSocrata
+from .soql import soql_quote
+from .socrata_reader import iter_pages
+from .sweep_store import sweep_store
+from .transport import transport, TransportSocrata
+from .instrumentation import timed
+
+def make_socrata_client():
+    '''Create a Socrata client for SOCRATA_DOMAIN (plain HTTP when SOCRATA_URI_PREFIX says so, recorded/replayed per TRANSPORT_MODE)'''
+    session_adapter = None
+    if SOCRATA_URI_PREFIX != "https://":
+        session_adapter = {"prefix": SOCRATA_URI_PREFIX, "adapter": requests.adapters.HTTPAdapter()}
+    client = TransportSocrata(Socrata(SOCRATA_DOMAIN, SOCRATA_APP_TOKEN, session_adapter=session_adapter), transport)
+
+    # Serve repeated queries from the on-disk response cache, except when recording or replaying
+    # (the cache would keep requests out of the archive)
+    if SOCRATA_CACHE_ENABLED and transport.mode == 'live':
+        return CachedSocrata(client)
+    return client
+
+
+def match_street_segment(segments, house_number):
+    """
+    Find the centerline segment whose left or right house number range contains a house number.
+
+    Args:
+        segments (list): Centerline records with l_low_hn/l_high_hn/r_low_hn/r_high_hn.
+        house_number (str): House number (e.g. "2025" or "94-16").
+
+    Returns:
+        tuple: (segment, side) with side 'L' or 'R', or (None, None) if no range matches.
+    """
+    key = house_number_key(house_number)
+    if key is None:
+        return None, None
+
+    for segment in segments:
+        for side in ('L', 'R'):
+            prefix = side.lower()
+            low = house_number_key(segment.get(f'{prefix}_low_hn'))
+            high = house_number_key(segment.get(f'{prefix}_high_hn'))
+            if low is not None and high is not None and low <= key <= high:
+                return segment, side
+    return None, None
+
 
 class DataFetcher: 
 
+    PAGE_SIZE = 1000  # Rows per request when paging through a Socrata query
+
     def __init__(self, data_path):
         """
         Initialize the DataFetcher class.
@@ -12,28 +69,47 @@ class DataFetcher:
         Args:
             data_path (str): Path to the directory containing CSV files.
         """
-        self.client = Socrata(SOCRATA_DOMAIN, SOCRATA_APP_TOKEN)
+        self.client = make_socrata_client()
         self.current_block_low = None  # Track the lower bound of the current block range
         self.current_block_high = None  # Track the upper bound of the current block range
         self.current_block_middle = None  # Track the middle of the current block range
+        self.street_segments = None  # (street, borough) -> centerline segments, set while a batch runs
         self.data_path = data_path
+        self.violation_store = ViolationStore()  # Columnar copies of the borough CSVs
+        self.frame_cache = borough_frame_cache  # Loaded borough frames shared across the process
 
         self.violations_data = None  # Placeholder for loaded violations data
+        self.block_index = None  # Sorted index over violations_data for block lookups
+        self.centerline_store = centerline_store  # Local centerline mirror, used once synced
+        self.sweep_store = sweep_store  # Local sweep history, synced incrementally per segment
 
-    def load_csv_data(self, file_path):
+    def load_csv_data(self, file_path, street_name=None, violation_code=None, block_range=None):
         """
         Load data from a CSV file into a DataFrame.
 
+        The file is read in chunks and, when a street, violation code or block range is
+        given, only the matching rows are kept, so large citywide files fit in memory.
+        The result uses VIOLATION_SCHEMA dtypes.
+
         Args:
             file_path (str): Path to the CSV file.
+            street_name (str, optional): Only keep violations on this street.
+            violation_code (int, optional): Only keep this violation code.
+            block_range (tuple, optional): Only keep house numbers in this (low, high) range.
         """
         try:
-            self.violations_data = pd.read_csv(file_path)
-            print(f"Loaded {len(self.violations_data)} rows from the CSV file.")
+            self.violations_data = apply_violation_schema(read_violations_filtered(
+                file_path,
+                street_name=street_name,
+                violation_code=violation_code,
+                block_range=block_range
+            ))
+            print(f"Loaded {len(self.violations_data)} rows ({frame_nbytes(self.violations_data) / 1024 ** 2:.1f} MB) from the CSV file.")
         except Exception as e:
             print(f"Error loading CSV data: {e}")
             self.violations_data = pd.DataFrame()  # Initialize as an empty DataFrame in case of error
 
+    @timed()
     def load_csv_for_borough(self, borough_code):
         """
         Load the appropriate CSV file based on the borough code.
@@ -55,14 +131,23 @@ class DataFetcher:
             self.violations_data = pd.DataFrame()  # Initialize as an empty DataFrame
             return
 
-        # Load the CSV data
+        # Load the columns we query from the columnar store (rebuilt if the CSV changed),
+        # reusing the frame already in memory when this version of the file was loaded before
         try:
-            self.violations_data = pd.read_csv(file_path)
-            print(f"Loaded {len(self.violations_data)} rows from {file_path}")
+            version = self.violation_store.source_version(file_path)
+
+            def load():
+                frame = apply_violation_schema(self.violation_store.load(file_path, columns=VIOLATION_COLUMNS))
+                print(f"Loaded {len(frame)} rows ({frame_nbytes(frame) / 1024 ** 2:.1f} MB) from {file_path}")
+                return BlockIndex(frame)
+
+            self.block_index = self.frame_cache.get_or_load(borough_code, version, load)
+            self.violations_data = self.block_index.frame
         except Exception as e:
             print(f"Error loading CSV file for borough {borough_name}: {e}")
             self.violations_data = pd.DataFrame()  # Initialize as an empty DataFrame
 
+    @timed()
     def get_street_centerline_by_address(self, full_street_name, house_number, borough_code=None):
         """
         Find street segment (physical_id) for a given address.
@@ -75,95 +160,175 @@ class DataFetcher:
         Returns:
             list: List of matching records with physical_id.
         """
-        # Normalize and validate inputs
-        full_street_name = full_street_name.upper().strip()
-        house_number_str = str(house_number or '')
+        # Answer from the local centerline mirror when it has been synced (no network I/O)
+        if self.centerline_store.is_synced():
+            segment, side = self.centerline_store.lookup(full_street_name, house_number, borough_code)
+            if segment is None:
+                return []
+            self._set_current_block(segment, side)
+            return [segment]
+
+        # Fetch the street's segments and match the house number against their ranges with
+        # integer house number keys (SoQL can only compare the range fields as text, which
+        # misorders e.g. "998" and "1000" and cannot order Queens numbers like "94-16")
         try:
-            house_number_int = int(house_number_str)
-        except Exception:
-            house_number_int = None
-
-        # Build Socrata WHERE clause for querying the dataset
-        where_clause = f"""
-        (full_street_name = '{full_street_name}')
-        AND (
-            (l_low_hn <= '{house_number_str}' AND l_high_hn >= '{house_number_str}')
-            OR
-            (r_low_hn <= '{house_number_str}' AND r_high_hn >= '{house_number_str}')
+            segments = self.get_street_segments(full_street_name, borough_code)
+
+            segment, side = match_street_segment(segments, house_number)
+            if segment is None:
+                return []
+            self._set_current_block(segment, side)
+            return [segment]
+
+        except Exception as e:
+            print(f"Error fetching street centerline: {e}")
+            return []
+
+    def _set_current_block(self, segment, side):
+        '''Remember the house number range of the side of the segment an address is on'''
+        prefix = side.lower()
+        self.current_block_low = segment[f'{prefix}_low_hn']
+        self.current_block_high = segment[f'{prefix}_high_hn']
+        self.current_side = side
+
+        low = house_number_key(self.current_block_low)
+        high = house_number_key(self.current_block_high)
+        if low is None or high is None:
+            self.current_block_middle = None
+        else:
+            # Middle of the range rounded down to a whole house number: no letter suffix, and
+            # no hyphen part unless both ends are hyphenated (Queens style, e.g. "94-01" to "94-99")
+            middle = (low + high) // 2
+            hyphenated = '-' in str(self.current_block_low) and '-' in str(self.current_block_high)
+            step = SUFFIX_SCALE if hyphenated else HYPHEN_SCALE * SUFFIX_SCALE
+            self.current_block_middle = format_house_number(middle - middle % step)
+
+    @property
+    def uncached_client(self):
+        '''The Socrata client without the response cache, for syncs that must download fresh data'''
+        return self.client.client if isinstance(self.client, CachedSocrata) else self.client
+
+    def iter_pages(self, dataset_id, where=None, select=None, order=None, page_size=None, cached=True, **kwargs):
+        """
+        Stream a Socrata query page by page, prefetching the next page in the background.
+
+        Args:
+            dataset_id (str): Dataset identifier.
+            where (str, optional): SoQL $where clause.
+            select (str, optional): SoQL $select clause.
+            order (str, optional): SoQL $order clause.
+            page_size (int, optional): Rows per request (default PAGE_SIZE).
+            cached (bool): Answer pages from the response cache (False for store syncs).
+            **kwargs: Other iter_pages options (keyset, max_rows, prefetch).
+
+        Yields:
+            list: Records of one page.
+        """
+        yield from iter_pages(
+            self.client if cached else self.uncached_client, dataset_id, where=where, select=select, order=order,
+            page_size=page_size or self.PAGE_SIZE, **kwargs
         )
+
+    def _get_all_pages(self, dataset_id, where, select=None, order=None, page_size=None):
+        """
+        Fetch every row of a Socrata query, page_size (default PAGE_SIZE) rows per request.
+
+        Returns:
+            list: All matching records.
+        """
+        rows = []
+        for page in self.iter_pages(dataset_id, where=where, select=select, order=order, page_size=page_size):
+            rows.extend(page)
+        return rows
+
+    def get_street_segments(self, full_street_name, borough_code=None):
+        """
+        Fetch every centerline segment of a street.
+
+        Args:
+            full_street_name (str): Street name (e.g. "VALENTINE AVE").
+            borough_code (str, optional): Borough code (1-5).
+
+        Returns:
+            list: Centerline records for the street.
         """
+        # A batch shares one memo between its trackers, so each street is fetched about once
+        key = (normalize_street_name(full_street_name), str(borough_code or ''))
+        if self.street_segments is not None and key in self.street_segments:
+            return self.street_segments[key]
 
+        where_clause = f"full_street_name = {soql_quote(key[0])}"
         if borough_code:
-            where_clause += f" AND boroughcode = '{borough_code}'"
+            where_clause += f" AND boroughcode = {soql_quote(borough_code)}"
 
-        # Query the Socrata API
-        try:
-            results = self.client.get(
-                "inkn-q76z",  # Dataset ID for Street Centerline
-                where=where_clause,
-                select="physicalid, full_street_name, l_low_hn, l_high_hn, r_low_hn, r_high_hn, boroughcode",
-                limit=3  # Limit to the top 3 results
-            )
-
-            print(f"Street centerline results count: {len(results)}")
-
-            # Filter results by proximity if numeric house number is provided
-            if house_number_int is not None:
-                filtered_results = [
-                    segment for segment in results
-                    if abs(int(segment['l_low_hn']) - house_number_int) <= 100 and abs(int(segment['r_low_hn']) - house_number_int) <= 100
-                ]
-            else:
-                filtered_results = list(results)
-
-            # Process the first result to determine the side of the street
-            if filtered_results:
-                first_result = filtered_results[0]
-
-                try:
-                    left_side = (int(first_result['l_low_hn']) <= house_number_int <= int(first_result['l_high_hn'])) if house_number_int is not None else False
-                except Exception:
-                    left_side = False
-
-                if left_side:
-                    self.current_block_low = first_result['l_low_hn']
-                    self.current_block_high = first_result['l_high_hn']
-                    self.current_side = 'L'
-                else:
-                    self.current_block_low = first_result['r_low_hn']
-                    self.current_block_high = first_result['r_high_hn']
-                    self.current_side = 'R'
-
-                try:
-                    self.current_block_middle = str((int(self.current_block_low) + int(self.current_block_high)) // 2)
-                except Exception:
-                    self.current_block_middle = None
-
-                return filtered_results
-            return []
+        segments = self._get_all_pages(
+            DATASET_IDS['street_centerline'],
+            where=where_clause,
+            select="physicalid, full_street_name, l_low_hn, l_high_hn, r_low_hn, r_high_hn, boroughcode",
+            order="physicalid"
+        )
+        if self.street_segments is not None:
+            self.street_segments[key] = segments
+        return segments
 
-        except Exception as e:
-            print(f"Error fetching street centerline: {e}")
-            return []
+    def get_street_centerline_bulk(self, addresses):
+        """
+        Resolve many addresses to centerline segments with one paged query per street.
+
+        Addresses are grouped by (street, borough); each street's segments are fetched once
+        and house numbers are matched against the segment ranges locally.
+
+        Args:
+            addresses (list): Dictionaries with street_name, house_number and borough_code.
+
+        Returns:
+            list: For each address (in input order), the matching segment record or None.
+        """
+        if self.centerline_store.is_synced():
+            return [
+                self.centerline_store.lookup(address['street_name'], address['house_number'], address.get('borough_code'))[0]
+                for address in addresses
+            ]
+
+        groups = {}
+        for i, address in enumerate(addresses):
+            borough_code = str(address.get('borough_code') or '')
+            key = (normalize_street_name(address['street_name']), borough_code)
+            groups.setdefault(key, []).append(i)
+
+        results = [None] * len(addresses)
+        for (street_name, borough_code), indexes in groups.items():
+            try:
+                segments = self.get_street_segments(street_name, borough_code or None)
+            except Exception as e:
+                print(f"Error fetching street segments for {street_name}: {e}")
+                continue
+
+            for i in indexes:
+                segment, _ = match_street_segment(segments, addresses[i]['house_number'])
+                results[i] = segment
+
+        print(f"Resolved {sum(r is not None for r in results)} of {len(addresses)} addresses with {len(groups)} street queries")
+        return results
 
+    @timed()
     def get_sweep_data(self, physical_id, limit=1):
         """
         Get the last swept date/time for a physical_id.
 
+        The history comes from the local sweep store, which first fetches any visits
+        newer than the ones it already has for this segment.
+
         Args:
             physical_id (str): Street segment physical ID.
-            limit (int): Maximum number of records to fetch.
+            limit (int): Maximum number of records to return, newest first.
 
         Returns:
-            list or None: List of sweep data records or None if an error occurs.
+            list or None: List of sweep data records ({"physical_id", "date_visited"}) or None if there are none.
         """
         try:
-            results = self.client.get(
-                DATASET_IDS['sweep_nyc'],
-                where=f"physical_id='{physical_id}'",
-                order="date_visited DESC",
-                limit=limit
-            )
+            self.sweep_store.sync(self, [physical_id])
+            results = self.sweep_store.records(physical_id, limit=limit)
 
             if results:
                 return results  # Return all records up to the requested limit
@@ -172,7 +337,7 @@ class DataFetcher:
             print(f"Error fetching sweep data: {e}")
             return None
 
-    def get_violations_for_whole_block(self, street_name, house_number, violation_code=21, limit=10000, borough_code=None):
+    def get_violations_for_whole_block(self, street_name, house_number, violation_code=21, limit=10000, borough_code=None, centerline_data=None):
         """
         Get parking violations for both sides of the street within the current block range.
 
@@ -182,19 +347,22 @@ class DataFetcher:
             violation_code (int): Violation code (default is 21 for street cleaning).
             limit (int): Maximum number of results.
             borough_code (str, optional): Borough code.
+            centerline_data (list, optional): Centerline records already resolved for the address.
 
         Returns:
             dict or pd.DataFrame: Violations data or error message.
         """
-        centerline_data = self.get_street_centerline_by_address(street_name, house_number)
+        if centerline_data is None:
+            centerline_data = self.get_street_centerline_by_address(street_name, house_number)
 
         if not centerline_data:
             return {"error": "Address not found in NYC Street Centerline database"}
 
-        # Extract block ranges for both sides of the street
+        # Extract block ranges for both sides of the street, comparing house numbers as integer keys
         block_info = centerline_data[0]
         house_number = str(house_number)
-        left_side = (block_info['l_low_hn'] <= house_number <= block_info['l_high_hn'])
+        _, side = match_street_segment([block_info], house_number)
+        left_side = side == 'L'
 
         if left_side:
             block_range = (block_info['l_low_hn'], block_info['l_high_hn'])
@@ -235,17 +403,12 @@ class DataFetcher:
             print("Violations data is not loaded. Make sure to load it before querying.")
             return pd.DataFrame()
 
-        # Filter data by street name and violation code
-        filtered_data = self.violations_data[
-            (self.violations_data['Street Name'] == street_name) &
-            (self.violations_data['Violation Code'] == violation_code)
-        ]
-
-        if house_number is not None and block_range:
-            low, high = block_range
-            filtered_data = filtered_data[
-                (filtered_data['House Number'] >= str(low)) & (filtered_data['House Number'] <= str(high))
-            ]
+        # Binary search the sorted borough index for the street, code and block range
+        filtered_data = self.block_index.lookup(
+            street_name,
+            violation_code,
+            block_range=block_range if house_number is not None else None
+        )
 
         print(f"Filtered {len(filtered_data)} violations for street '{street_name}' with code {violation_code}.")
         return filtered_data
@@ -0,0 +1,126 @@
+import threading
+from collections import OrderedDict
+from config import FRAME_CACHE_MAX_BYTES
+from .instrumentation import count
+
+
+def frame_nbytes(value):
+    '''Memory used by a cached value, measured with memory_usage(deep=True) for DataFrames'''
+    if hasattr(value, 'memory_usage'):
+        return int(value.memory_usage(deep=True).sum())
+    return int(getattr(value, 'nbytes', 0))
+
+
+class FrameCache:
+    '''Process-wide LRU cache of loaded borough DataFrames bounded by a memory budget'''
+
+    def __init__(self, max_bytes=FRAME_CACHE_MAX_BYTES):
+        """
+        Initialize the FrameCache.
+
+        Args:
+            max_bytes (int): Memory budget for all cached frames together.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (borough_code, version) -> (frame, nbytes)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._load_locks = {}
+
+    def get(self, borough_code, version):
+        '''Return the cached frame for a borough/version, or None'''
+        key = (borough_code, version)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                count('cache_misses', cache='frame')
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            count('cache_hits', cache='frame')
+            return entry[0]
+
+    def put(self, borough_code, version, frame):
+        '''Store a frame, dropping older versions of the borough and evicting to fit the budget'''
+        key = (borough_code, version)
+        nbytes = frame_nbytes(frame)
+        with self._lock:
+            for old_key in [k for k in self.entries if k[0] == borough_code and k != key]:
+                self._remove(old_key)
+            if key in self.entries:
+                self._remove(key)
+
+            self.entries[key] = (frame, nbytes)
+            self.total_bytes += nbytes
+
+            # Evict least recently used frames, but always keep the one just added
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, borough_code, version, loader):
+        """
+        Return the cached frame for a borough/version, calling loader() on a miss.
+
+        Concurrent callers asking for the same borough wait for a single load.
+
+        Args:
+            borough_code (str): Borough code.
+            version: File version the frame was loaded from (e.g. mtime and size).
+            loader (callable): Function returning the frame to cache.
+
+        Returns:
+            The cached or freshly loaded frame.
+        """
+        frame = self.get(borough_code, version)
+        if frame is not None:
+            return frame
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault((borough_code, version), threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                entry = self.entries.get((borough_code, version))
+            if entry is not None:
+                return entry[0]
+
+            frame = loader()
+            self.put(borough_code, version, frame)
+
+        with self._lock:
+            self._load_locks.pop((borough_code, version), None)
+        return frame
+
+    def _remove(self, key):
+        '''Drop an entry (caller holds the lock)'''
+        _, nbytes = self.entries.pop(key)
+        self.total_bytes -= nbytes
+
+    def clear(self):
+        '''Remove every cached frame (counters are kept)'''
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        '''Return hit/miss/eviction counters and current memory use'''
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Shared by every DataFetcher in the process
+borough_frame_cache = FrameCache()
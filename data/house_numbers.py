@@ -0,0 +1,105 @@
+import math
+import re
+
+# House numbers are keyed as ((number * HYPHEN_SCALE) + hyphen suffix) * SUFFIX_SCALE + suffix code,
+# so "94-16" sorts between 94 and 95, and "12A" between 12 and 13.
+# Suffix codes: none = 0, A-Z = 1-26, "1/2" = 27.
+HYPHEN_SCALE = 10000
+SUFFIX_SCALE = 32
+HALF_SUFFIX = 27
+
+_HOUSE_NUMBER = r'^\s*(\d+)(?:\s*-\s*(\d+))?\s*(?:([A-Za-z])(?![A-Za-z])|(1/2))?'
+_HOUSE_NUMBER_RE = re.compile(_HOUSE_NUMBER)
+
+
+def _suffix_code(letter, half):
+    '''Suffix code of a house number: 0 for none, 1-26 for A-Z, HALF_SUFFIX for "1/2"'''
+    if letter:
+        return ord(letter.upper()) - ord('A') + 1
+    return HALF_SUFFIX if half else 0
+
+
+def house_number_key(house_number):
+    """
+    Convert a house number into a sortable integer key.
+
+    Args:
+        house_number (str or int): House number (e.g. "2025", 2025, "94-16" or "12A").
+
+    Returns:
+        int or None: Integer key, or None if the value is not a house number.
+    """
+    if house_number is None:
+        return None
+    if isinstance(house_number, float):
+        if math.isnan(house_number):
+            return None
+        house_number = int(house_number)
+
+    match = _HOUSE_NUMBER_RE.match(str(house_number))
+    if not match:
+        return None
+    number, hyphen_suffix, letter, half = match.groups()
+    return (int(number) * HYPHEN_SCALE + int(hyphen_suffix or 0)) * SUFFIX_SCALE + _suffix_code(letter, half)
+
+
+def format_house_number(key):
+    '''Canonical text of a house number key (e.g. key of " 94 - 16" -> "94-16", of "12a" -> "12A")'''
+    number_key, suffix = divmod(int(key), SUFFIX_SCALE)
+    number, hyphen_suffix = divmod(number_key, HYPHEN_SCALE)
+    text = f"{number}-{hyphen_suffix:02}" if hyphen_suffix else str(number)
+    if suffix == HALF_SUFFIX:
+        return f"{text} 1/2"
+    if suffix:
+        return text + chr(ord('A') + suffix - 1)
+    return text
+
+
+def canonical_house_number(house_number):
+    '''Canonical text of a house number, or the stripped, upper-cased input if it does not parse'''
+    key = house_number_key(house_number)
+    if key is None:
+        return str(house_number).strip().upper()
+    return format_house_number(key)
+
+
+def house_number_keys(house_numbers):
+    """
+    Vectorized house_number_key over a column.
+
+    Args:
+        house_numbers (pd.Series or array-like): House number column.
+
+    Returns:
+        np.ndarray: int64 keys, with -1 where a value is not a house number.
+    """
+    # Imported here so the scalar helpers (used by cache-only lookups) don't load pandas
+    import numpy as np
+    import pandas as pd
+
+    series = pd.Series(house_numbers)
+
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        keys = np.full(len(values), -1, dtype=np.int64)
+        valid = np.isfinite(values)
+        keys[valid] = values[valid].astype(np.int64) * HYPHEN_SCALE * SUFFIX_SCALE
+        return keys
+
+    # Parse each distinct value once with one vectorized regex pass, then broadcast back over the rows
+    codes, uniques = pd.factorize(series)
+    parts = pd.Series(uniques, dtype=object).astype(str).str.extract(_HOUSE_NUMBER)
+
+    number = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    hyphen_suffix = pd.to_numeric(parts[1], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    letters = parts[2].fillna('').str.upper().to_numpy(dtype='U1')
+    suffix = np.where(letters != '', letters.view(np.int32) - ord('A') + 1, 0)
+    suffix = np.where(parts[3].notna().to_numpy(), HALF_SUFFIX, suffix)
+
+    valid = np.isfinite(number)
+    unique_keys = np.full(len(uniques), -1, dtype=np.int64)
+    unique_keys[valid] = (
+        (number[valid].astype(np.int64) * HYPHEN_SCALE + hyphen_suffix[valid]) * SUFFIX_SCALE + suffix[valid]
+    )
+    unique_keys = np.append(unique_keys, -1)  # code -1 (missing) picks the trailing -1
+    return unique_keys[codes]
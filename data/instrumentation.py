@@ -0,0 +1,155 @@
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from config import INSTRUMENTATION_ENABLED, SPAN_BUCKETS
+
+METRIC_PREFIX = 'sweepinsights'
+
+
+def _label_value(value):
+    '''Label value escaped for the Prometheus text format (backslash, double quote and newline)'''
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _NoSpan:
+    '''Context manager used while instrumentation is disabled'''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Registry:
+    '''In-process registry of span timings and counters, dumped as JSON or Prometheus text'''
+
+    def __init__(self, enabled=INSTRUMENTATION_ENABLED, buckets=SPAN_BUCKETS):
+        """
+        Initialize the Registry.
+
+        Args:
+            enabled (bool): Record spans and counters (when False every call returns immediately).
+            buckets (list): Upper bounds in seconds of the span duration histogram buckets.
+        """
+        self.enabled = enabled
+        self.buckets = sorted(buckets)
+        self.spans = {}  # name -> {"count", "sum", "max", "buckets"}
+        self.counters = {}  # (name, sorted label items) -> value
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        '''Drop every recorded span and counter'''
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+    def observe(self, name, seconds):
+        '''Record one span duration'''
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * (len(self.buckets) + 1)}
+            stats["count"] += 1
+            stats["sum"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["buckets"][bisect_left(self.buckets, seconds)] += 1
+
+    def span(self, name):
+        '''Context manager timing the enclosed block as span `name`'''
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name=None):
+        '''Decorator timing every call of a function as a span (named after the function by default)'''
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(span_name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def count(self, name, amount=1, **labels):
+        '''Add to a counter (e.g. count('cache_hits', cache='frame'))'''
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self):
+        '''Spans (count, total/mean/max seconds) and counters as plain dictionaries'''
+        with self._lock:
+            spans = {
+                name: {
+                    "count": stats["count"],
+                    "total_seconds": round(stats["sum"], 6),
+                    "mean_ms": round(stats["sum"] / stats["count"] * 1000, 3),
+                    "max_ms": round(stats["max"] * 1000, 3),
+                }
+                for name, stats in self.spans.items()
+            }
+            counters = {}
+            for (name, labels), value in self.counters.items():
+                counters.setdefault(name, {})[','.join(f"{k}={v}" for k, v in labels) or "total"] = value
+        return {"enabled": self.enabled, "spans": spans, "counters": counters}
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        '''Prometheus text exposition: one histogram for the spans and one counter per name'''
+        lines = []
+        with self._lock:
+            if self.spans:
+                metric = f"{METRIC_PREFIX}_span_seconds"
+                lines += [f"# HELP {metric} Duration of instrumented pipeline stages.", f"# TYPE {metric} histogram"]
+                for name, stats in sorted(self.spans.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ['+Inf'], stats["buckets"]):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{span="{_label_value(name)}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{span="{_label_value(name)}"}} {stats["sum"]:.6f}')
+                    lines.append(f'{metric}_count{{span="{_label_value(name)}"}} {stats["count"]}')
+
+            for counter_name in sorted({name for name, _ in self.counters}):
+                metric = f"{METRIC_PREFIX}_{counter_name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (name, labels), value in sorted(self.counters.items()):
+                    if name == counter_name:
+                        label_text = ','.join(f'{k}="{_label_value(v)}"' for k, v in labels)
+                        lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by the whole process; module-level shortcuts for instrumented code
+registry = Registry()
+span = registry.span
+timed = registry.timed
+count = registry.count
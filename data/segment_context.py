@@ -0,0 +1,117 @@
+class SegmentContext:
+    '''Data for one address, fetched lazily and at most once per source for all analysis functions'''
+
+    def __init__(self, tracker, street_name, house_number, borough_code=None, violation_code=21):
+        """
+        Initialize the SegmentContext.
+
+        Args:
+            tracker (SweepTracker): Tracker whose fetcher and address cache are used.
+            street_name (str): Street name (e.g. "Valentine Ave").
+            house_number (str): House number.
+            borough_code (str, optional): Borough code (1-5).
+            violation_code (int): Violation code for block violations (default 21, street cleaning).
+        """
+        self.tracker = tracker
+        self.street_name = street_name
+        self.house_number = house_number
+        self.borough_code = borough_code
+        self.violation_code = violation_code
+        self._memo = {}
+
+    def _get(self, name, load):
+        '''Return a memoized value, calling load() the first time'''
+        if name not in self._memo:
+            self._memo[name] = load()
+        return self._memo[name]
+
+    @property
+    def centerline(self):
+        '''Centerline records for the address (empty list if not found)'''
+        return self._get('centerline', lambda: self.tracker.data_fetcher.get_street_centerline_by_address(
+            self.street_name, self.house_number, self.borough_code
+        ))
+
+    @property
+    def side(self):
+        '''Side of the street ('L' or 'R') the house number is on, or None'''
+        from .data_fetcher import match_street_segment
+
+        return self._get('side', lambda: match_street_segment(self.centerline, self.house_number)[1] if self.centerline else None)
+
+    @property
+    def physical_id(self):
+        '''Street segment physical_id, from the address cache or the centerline records'''
+        def load():
+            physical_id = self.tracker.address_mapper.get_cached_physical_id(
+                self.street_name, self.house_number, self.borough_code
+            )
+            if physical_id:
+                return physical_id
+            if not self.centerline:
+                return None
+            physical_id = self.centerline[0]['physicalid']
+            self.tracker.address_mapper.cache_physical_id(
+                self.street_name, self.house_number, physical_id, self.borough_code
+            )
+            return physical_id
+        return self._get('physical_id', load)
+
+    def sweep_history(self, limit):
+        '''The newest `limit` sweep records; fetched once with the largest limit asked for'''
+        fetched_limit, records = self._memo.get('sweep_history', (0, None))
+        if limit > fetched_limit:
+            records = None
+            if self.physical_id:
+                records = self.tracker.data_fetcher.get_sweep_data(self.physical_id, limit=limit)
+            self._memo['sweep_history'] = (limit, records)
+            fetched_limit = limit
+        return records[:limit] if records else records
+
+    def sweep_statuses(self, num_records=1):
+        '''Same result as SweepTracker.get_sweep_statuses, built from the memoized sweep history'''
+        if not self.physical_id:
+            error_result = {
+                "status": "error",
+                "message": "Address not found in NYC Street Centerline database"
+            }
+            return error_result if num_records == 1 else [error_result]
+
+        return self.tracker.build_sweep_statuses(
+            self.sweep_history(num_records), self.street_name, self.house_number, self.physical_id, num_records
+        )
+
+    @property
+    def block_risk(self):
+        '''Precomputed ticket likelihood for the address's block side, or None if it was not precomputed'''
+        from .block_risk import block_risk_table
+
+        def load():
+            if not block_risk_table.is_built() or not self.physical_id or not self.side:
+                return None
+            return block_risk_table.lookup(self.physical_id, self.side, self.street_name, self.house_number)
+        return self._get('block_risk', load)
+
+    @property
+    def sign_rules(self):
+        '''Parsed SweepNYC sign rules for the address'''
+        from geoclient.sweep_rules_geoclient import get_sweep_rules_by_address
+
+        return self._get('sign_rules', lambda: get_sweep_rules_by_address(
+            self.house_number, self.street_name, self.borough_code
+        ))
+
+    @property
+    def block_violations(self):
+        '''Violations on the address's side of the block (a DataFrame, or a dict with an error)'''
+        def load():
+            if not self.centerline:
+                return {"error": "Address not found in NYC Street Centerline database"}
+            return self.tracker.data_fetcher.get_violations_for_whole_block(
+                self.street_name,
+                self.house_number,
+                violation_code=self.violation_code,
+                borough_code=self.borough_code,
+                centerline_data=self.centerline
+            )
+        return self._get('block_violations', load)
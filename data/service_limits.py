@@ -0,0 +1,34 @@
+import threading
+from contextlib import contextmanager
+from config import SERVICE_CONCURRENCY
+
+_lock = threading.Lock()
+_semaphores = {}
+
+
+def configure_service_limits(limits):
+    """
+    Set the maximum number of concurrent requests per service.
+
+    Args:
+        limits (dict): Service name (e.g. 'socrata') -> maximum requests in flight.
+    """
+    with _lock:
+        for service, limit in limits.items():
+            _semaphores[service] = threading.BoundedSemaphore(max(1, int(limit)))
+
+
+def _semaphore(service):
+    '''Semaphore for a service, created from SERVICE_CONCURRENCY on first use'''
+    with _lock:
+        if service not in _semaphores:
+            _semaphores[service] = threading.BoundedSemaphore(SERVICE_CONCURRENCY.get(service, 1))
+        return _semaphores[service]
+
+
+@contextmanager
+def service_slot(service):
+    '''Hold one of the service's concurrency slots for the duration of a request'''
+    semaphore = _semaphore(service)
+    with semaphore:
+        yield
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from config import (
+    SOCRATA_CACHE_FILE, SOCRATA_CACHE_VERSION, SOCRATA_CACHE_MAX_BYTES,
+    SOCRATA_CACHE_DEFAULT_TTL, SOCRATA_CACHE_TTLS
+)
+from .instrumentation import count
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class CachedSocrata:
+    '''Wraps a Socrata client and answers repeated get() calls from an on-disk SQLite cache'''
+
+    def __init__(self, client, cache_file=SOCRATA_CACHE_FILE, ttls=None, max_bytes=SOCRATA_CACHE_MAX_BYTES):
+        """
+        Initialize the CachedSocrata wrapper.
+
+        Args:
+            client (Socrata): Client used for cache misses.
+            cache_file (str): SQLite database holding cached responses.
+            ttls (dict, optional): Dataset id -> time to live in seconds (0 disables caching).
+            max_bytes (int): Size cap for stored responses; least recently used ones are evicted.
+        """
+        self.client = client
+        self.cache_file = cache_file
+        self.ttls = dict(SOCRATA_CACHE_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    dataset TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    nbytes INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def __getattr__(self, name):
+        # Everything except get() goes straight to the wrapped client
+        return getattr(self.client, name)
+
+    def _connection(self):
+        '''SQLite connection for the current thread'''
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def _make_key(self, dataset_identifier, kwargs):
+        '''Cache key from the dataset id and the query parameters'''
+        params = {
+            name: _WHITESPACE.sub(' ', value).strip() if isinstance(value, str) else value
+            for name, value in sorted(kwargs.items()) if value is not None
+        }
+        raw = json.dumps([SOCRATA_CACHE_VERSION, dataset_identifier, params], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, dataset_identifier, **kwargs):
+        """
+        Same as Socrata.get, served from the cache while the dataset's TTL has not expired.
+
+        Returns:
+            list: Records returned by the query.
+        """
+        ttl = self.ttls.get(dataset_identifier, SOCRATA_CACHE_DEFAULT_TTL)
+        if not ttl:
+            return self.client.get(dataset_identifier, **kwargs)
+
+        key = self._make_key(dataset_identifier, kwargs)
+        conn = self._connection()
+        now = time.time()
+
+        row = conn.execute("SELECT body, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            body, created = row
+            if now - created <= ttl:
+                conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self._count("hits")
+                count('cache_hits', cache='socrata')
+                return json.loads(zlib.decompress(body))
+            self._count("expired")
+        self._count("misses")
+        count('cache_misses', cache='socrata')
+
+        results = self.client.get(dataset_identifier, **kwargs)
+
+        body = zlib.compress(json.dumps(results).encode('utf-8'))
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, dataset, body, nbytes, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, dataset_identifier, body, len(body), now, now)
+        )
+        conn.commit()
+        self._count("stores")
+        self._evict(conn)
+        return results
+
+    def _evict(self, conn):
+        '''Drop least recently used responses until the cache fits in max_bytes'''
+        total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, nbytes in conn.execute("SELECT key, nbytes FROM responses ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= nbytes
+            evicted += 1
+        conn.commit()
+        self._count("evictions", evicted)
+
+    def clear(self):
+        '''Remove every cached response'''
+        conn = self._connection()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+
+    def stats(self):
+        '''Counters for this process plus entries and bytes stored per dataset'''
+        datasets = {
+            dataset: {"entries": entries, "bytes": nbytes}
+            for dataset, entries, nbytes in self._connection().execute(
+                "SELECT dataset, COUNT(*), SUM(nbytes) FROM responses GROUP BY dataset"
+            )
+        }
+        with self._lock:
+            stats = dict(self.counters)
+        stats["datasets"] = datasets
+        stats["bytes"] = sum(d["bytes"] for d in datasets.values())
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def report(self):
+        '''Human readable cache statistics'''
+        stats = self.stats()
+        lines = [
+            "Socrata response cache",
+            "=" * 50,
+            f"Hits: {stats['hits']}  Misses: {stats['misses']}  Expired: {stats['expired']}  "
+            f"Stores: {stats['stores']}  Evictions: {stats['evictions']}",
+            f"Size: {stats['bytes'] / 1024 ** 2:.1f} MB of {stats['max_bytes'] / 1024 ** 2:.0f} MB",
+        ]
+        for dataset, info in sorted(stats["datasets"].items()):
+            ttl = self.ttls.get(dataset, SOCRATA_CACHE_DEFAULT_TTL)
+            lines.append(f"- {dataset}: {info['entries']} responses, {info['bytes'] / 1024:.0f} KB, TTL {ttl}s")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+
+    cache = CachedSocrata(client=None)
+    if "--clear" in sys.argv:
+        cache.clear()
+        print("Cleared the Socrata response cache.")
+    print(cache.report())
@@ -0,0 +1,139 @@
+import queue
+import threading
+import numpy as np
+from .service_limits import service_slot
+from .soql import soql_quote
+
+_DONE = object()
+
+
+def _fetch_pages(client, dataset_id, where, select, order, page_size, keyset, max_rows):
+    '''Request pages one after another until a short page (or max_rows) ends the query'''
+    offset = 0
+    last_key = None
+    fetched = 0
+    while max_rows is None or fetched < max_rows:
+        limit = page_size if max_rows is None else min(page_size, max_rows - fetched)
+        page_where = where
+        if keyset and last_key is not None:
+            # Keyset paging: continue after the last key instead of counting an offset
+            key_clause = f"{keyset} > {soql_quote(last_key)}"
+            page_where = f"({where}) AND {key_clause}" if where else key_clause
+
+        with service_slot('socrata'):
+            page = client.get(
+                dataset_id,
+                where=page_where,
+                select=select,
+                order=keyset or order,
+                limit=limit,
+                offset=None if keyset else offset
+            )
+        if page:
+            yield page
+        fetched += len(page)
+        if len(page) < limit:
+            return
+        offset += len(page)
+        if keyset:
+            last_key = page[-1][keyset]
+
+
+def iter_pages(client, dataset_id, where=None, select=None, order=None, page_size=1000,
+               keyset=None, max_rows=None, prefetch=True):
+    """
+    Yield the rows of a Socrata query one page at a time.
+
+    With prefetch, the next page is requested on a background thread while the caller
+    works on the current one. At most one page waits in the queue, so memory use stays
+    at about two pages whatever the size of the result.
+
+    Args:
+        client (Socrata): Client (or CachedSocrata) used for the requests.
+        dataset_id (str): Dataset identifier.
+        where (str, optional): SoQL $where clause.
+        select (str, optional): SoQL $select clause.
+        order (str, optional): SoQL $order clause; needed for stable $offset paging.
+        page_size (int): Rows per request.
+        keyset (str, optional): Unique column to page on (`keyset > last value`) instead of
+            $offset; the query is ordered by it and `select` must include it.
+        max_rows (int, optional): Stop after this many rows.
+        prefetch (bool): Request the next page in the background.
+
+    Yields:
+        list: Records of one page.
+    """
+    pages = _fetch_pages(client, dataset_id, where, select, order, page_size, keyset, max_rows)
+    if not prefetch:
+        yield from pages
+        return
+
+    buffer = queue.Queue(maxsize=1)
+    stop = threading.Event()
+
+    def put(item):
+        '''Wait for room in the queue; False if the consumer went away first'''
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(e)
+
+    producer = threading.Thread(target=produce, name=f"socrata-prefetch-{dataset_id}", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+def iter_rows(client, dataset_id, **kwargs):
+    '''Yield the records of a Socrata query one by one (same arguments as iter_pages)'''
+    for page in iter_pages(client, dataset_id, **kwargs):
+        yield from page
+
+
+def iter_column_chunks(client, dataset_id, columns, dtypes=None, **kwargs):
+    """
+    Yield a Socrata query as typed column arrays, one chunk per page.
+
+    Args:
+        client (Socrata): Client used for the requests.
+        dataset_id (str): Dataset identifier.
+        columns (list): Fields to extract (also used as $select unless one is given).
+        dtypes (dict, optional): Field -> numpy dtype (default str). Missing values become ''
+            in text columns and NaN/NaT in float and datetime columns.
+        **kwargs: Passed to iter_pages.
+
+    Yields:
+        dict: Field -> np.ndarray for the rows of one page.
+    """
+    dtypes = {column: np.dtype((dtypes or {}).get(column, str)) for column in columns}
+    missing = {column: '' if dtype.kind in 'US' else None for column, dtype in dtypes.items()}
+    kwargs.setdefault('select', ", ".join(columns))
+    for page in iter_pages(client, dataset_id, **kwargs):
+        yield {
+            column: np.array(
+                [row.get(column) if row.get(column) is not None else missing[column] for row in page],
+                dtype=dtypes[column]
+            )
+            for column in columns
+        }
@@ -0,0 +1,41 @@
+import numpy as np
+from config import SOCRATA_MAX_WHERE_CHARS
+
+
+def soql_quote(value):
+    '''Quote a value as a SoQL string literal'''
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def soql_timestamp(value):
+    '''Format a datetime/datetime64/string as a SoQL floating timestamp (e.g. "2024-05-01T09:30:00.000")'''
+    if isinstance(value, str):
+        return value
+    return str(np.datetime64(value, 'ms'))
+
+
+def in_clause_chunks(column, values, suffix=""):
+    """
+    Split values into `column IN (...)` clauses that each stay under SOCRATA_MAX_WHERE_CHARS.
+
+    Args:
+        column (str): Column to match.
+        values (list): Values to match; each is quoted as a string literal.
+        suffix (str): Extra condition appended to every clause (e.g. " AND date_visited > '...'").
+
+    Returns:
+        list: (values in the chunk, where clause) tuples.
+    """
+    base_length = len(suffix) + len(f"{column} IN ()")
+    chunks, chunk, quoted_chunk, length = [], [], [], base_length
+    for value in values:
+        quoted = soql_quote(value)
+        if chunk and length + len(quoted) + 1 > SOCRATA_MAX_WHERE_CHARS:
+            chunks.append((chunk, f"{column} IN ({','.join(quoted_chunk)}){suffix}"))
+            chunk, quoted_chunk, length = [], [], base_length
+        chunk.append(value)
+        quoted_chunk.append(quoted)
+        length += len(quoted) + 1
+    if chunk:
+        chunks.append((chunk, f"{column} IN ({','.join(quoted_chunk)}){suffix}"))
+    return chunks
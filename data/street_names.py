@@ -0,0 +1,34 @@
+import re
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Street suffixes and directions spelled out in some datasets and abbreviated in others
+_ABBREVIATIONS = {
+    'AVENUE': 'AVE', 'AV': 'AVE',
+    'STREET': 'ST',
+    'ROAD': 'RD',
+    'PLACE': 'PL',
+    'BOULEVARD': 'BLVD',
+    'PARKWAY': 'PKWY',
+    'DRIVE': 'DR',
+    'LANE': 'LN',
+    'COURT': 'CT',
+    'TERRACE': 'TER',
+    'EXPRESSWAY': 'EXPY',
+    'HIGHWAY': 'HWY',
+    'SQUARE': 'SQ',
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+}
+
+
+def normalize_street_name(street_name):
+    '''Normalize a street name for matching (e.g. " Valentine  Ave" -> "VALENTINE AVE")'''
+    if street_name is None:
+        return ''
+    return _WHITESPACE.sub(' ', str(street_name)).strip().upper()
+
+
+def canonical_street_name(street_name):
+    '''normalize_street_name with suffixes and directions abbreviated (e.g. "Valentine Avenue" -> "VALENTINE AVE")'''
+    words = normalize_street_name(street_name).replace('.', '').split(' ')
+    return ' '.join(_ABBREVIATIONS.get(word, word) for word in words)
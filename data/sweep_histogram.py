@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from config import SWEEP_BIN_MINUTES
+from .violation_times import format_minutes, MINUTES_PER_DAY, MISSING_MINUTE
+
+
+def sweep_minutes(date_visited):
+    """
+    Convert sweep visit times into minutes since midnight.
+
+    Args:
+        date_visited (array-like): ISO 'date_visited' strings (e.g. '2024-05-01T09:12:00.000'),
+            'HH:MM' strings, datetime64 values, or epoch seconds.
+
+    Returns:
+        np.ndarray: int16 minutes since midnight, MISSING_MINUTE where a value can't be read.
+    """
+    values = np.asarray(date_visited)
+    if values.size == 0:
+        return np.array([], dtype=np.int16)
+
+    if np.issubdtype(values.dtype, np.datetime64):
+        valid = ~np.isnat(values)
+        minutes = values.astype('datetime64[m]').astype(np.int64) % MINUTES_PER_DAY
+        return np.where(valid, minutes, MISSING_MINUTE).astype(np.int16)
+
+    if np.issubdtype(values.dtype, np.number):
+        valid = np.isfinite(values)
+        minutes = (np.nan_to_num(values).astype(np.int64) // 60) % MINUTES_PER_DAY
+        return np.where(valid, minutes, MISSING_MINUTE).astype(np.int16)
+
+    # Text: read HH and MM straight out of the bytes, at offset 0 ('HH:MM') or 11 (ISO)
+    text = pd.Series(values, dtype=object).fillna('').astype(str).to_numpy(dtype='S16')
+    raw = text.view(np.uint8).reshape(len(text), 16)
+    offset = np.where(raw[:, 2] == ord(':'), 0, 11)[:, None]
+    hhmm = np.take_along_axis(raw, offset + np.array([0, 1, 3, 4]), axis=1).astype(np.int16) - ord('0')
+    colon = np.take_along_axis(raw, offset + 2, axis=1)[:, 0]
+
+    hours = hhmm[:, 0] * 10 + hhmm[:, 1]
+    minutes = hhmm[:, 2] * 10 + hhmm[:, 3]
+    valid = (
+        np.all((hhmm >= 0) & (hhmm <= 9), axis=1)
+        & (colon == ord(':'))
+        & (hours < 24) & (minutes < 60)
+    )
+    return np.where(valid, hours * 60 + minutes, MISSING_MINUTE).astype(np.int16)
+
+
+def _check_bin_minutes(bin_minutes):
+    '''Validate that the histogram bins tile a whole day'''
+    if bin_minutes <= 0 or MINUTES_PER_DAY % bin_minutes:
+        raise ValueError(f"bin_minutes must divide {MINUTES_PER_DAY}, got {bin_minutes}")
+
+
+def _check_top_k(top_k):
+    '''Validate that at least the most common interval is reported'''
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+
+
+def _summarize(counts, bin_minutes, top_k):
+    '''Build the result dictionary for one histogram row'''
+    total = int(counts.sum())
+    if total == 0:
+        return {"status": "error", "message": "No valid sweep times after parsing."}
+
+    # Stable sort so ties go to the earlier interval
+    top_bins = [int(b) for b in np.argsort(-counts, kind='stable')[:top_k] if counts[b] > 0]
+    intervals = [
+        {
+            "interval": f"{format_minutes(b * bin_minutes)} - {format_minutes((b + 1) * bin_minutes)}",
+            "frequency": int(counts[b]),
+            "percentage": round(float(counts[b]) / total * 100, 2),
+        }
+        for b in top_bins
+    ]
+
+    return {
+        "status": "success",
+        "most_common": intervals[0],
+        "second_most_common": intervals[1] if len(intervals) > 1 else None,
+        "top_intervals": intervals,
+        "counts_debug": {format_minutes(b * bin_minutes): int(counts[b]) for b in np.flatnonzero(counts)},
+        "total_samples": total,
+        "bin_minutes": bin_minutes,
+    }
+
+
+def sweep_time_histogram(date_visited, bin_minutes=SWEEP_BIN_MINUTES, top_k=2):
+    """
+    Bin sweep times into fixed-width intervals and report the most common ones.
+
+    Args:
+        date_visited (array-like): Values accepted by sweep_minutes.
+        bin_minutes (int): Interval width in minutes (5, 10, 15, 30, ...).
+        top_k (int): Number of top intervals to return (at least 1).
+
+    Returns:
+        dict: most_common / second_most_common / top_intervals, counts_debug and total_samples.
+
+    Raises:
+        ValueError: If bin_minutes doesn't divide a day or top_k is less than 1.
+    """
+    _check_bin_minutes(bin_minutes)
+    _check_top_k(top_k)
+    minutes = sweep_minutes(date_visited)
+    if minutes.size == 0:
+        return {"status": "error", "message": "No sweep_times provided."}
+
+    minutes = minutes[minutes != MISSING_MINUTE]
+    counts = np.bincount(minutes // bin_minutes, minlength=MINUTES_PER_DAY // bin_minutes)
+    return _summarize(counts, bin_minutes, top_k)
+
+
+def sweep_time_histograms(physical_ids, date_visited, bin_minutes=SWEEP_BIN_MINUTES, top_k=2):
+    """
+    Batched sweep_time_histogram over many segments with a single bincount.
+
+    Args:
+        physical_ids (array-like): physical_id of each sweep record.
+        date_visited (array-like): Visit time of each sweep record (same length).
+        bin_minutes (int): Interval width in minutes.
+        top_k (int): Number of top intervals to return per segment (at least 1).
+
+    Returns:
+        dict: physical_id -> result dictionary as returned by sweep_time_histogram.
+
+    Raises:
+        ValueError: If bin_minutes doesn't divide a day or top_k is less than 1.
+    """
+    _check_bin_minutes(bin_minutes)
+    _check_top_k(top_k)
+    num_bins = MINUTES_PER_DAY // bin_minutes
+
+    segment_codes, segments = pd.factorize(pd.Series(physical_ids))
+    minutes = sweep_minutes(date_visited)
+    valid = (segment_codes >= 0) & (minutes != MISSING_MINUTE)
+
+    flat = segment_codes[valid].astype(np.int64) * num_bins + minutes[valid] // bin_minutes
+    counts = np.bincount(flat, minlength=len(segments) * num_bins).reshape(len(segments), num_bins)
+
+    return {segment: _summarize(counts[i], bin_minutes, top_k) for i, segment in enumerate(segments)}
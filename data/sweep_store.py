@@ -0,0 +1,273 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import numpy as np
+from config import SWEEP_STORE_DB, SWEEP_STORE_MAX_AGE, DATASET_IDS
+from .soql import soql_quote, soql_timestamp, in_clause_chunks
+
+
+def _to_ms(date_visited):
+    '''Socrata date_visited ("2024-05-01T09:30:00.000") -> milliseconds since the epoch'''
+    return int(np.datetime64(date_visited, 'ms').astype(np.int64))
+
+
+def _visit_ms(row):
+    '''Milliseconds since the epoch of a record's date_visited, or None if it is missing or unparseable'''
+    try:
+        visited = np.datetime64(row.get('date_visited'), 'ms')
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnat(visited) else int(visited.astype(np.int64))
+
+
+def _from_ms(ms):
+    '''Milliseconds since the epoch -> date_visited string in the format Socrata returns'''
+    return str(np.datetime64(int(ms), 'ms'))
+
+
+class SweepStore:
+    '''Local sweep history per physical_id, kept current by fetching only visits newer than each segment's watermark'''
+
+    def __init__(self, db_file=SWEEP_STORE_DB, max_age=SWEEP_STORE_MAX_AGE):
+        """
+        Initialize the SweepStore.
+
+        Args:
+            db_file (str): SQLite database holding the visits.
+            max_age (int): Seconds a segment's history is used before it is synced again.
+        """
+        self.db_file = db_file
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        '''Open (and create) the SQLite database on first use'''
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # One row per visit: text id plus integer milliseconds, clustered by segment
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS visits (
+                    physical_id TEXT NOT NULL,
+                    visited INTEGER NOT NULL,
+                    PRIMARY KEY (physical_id, visited)
+                ) WITHOUT ROWID
+            """)
+            # watermark: newest visit stored; synced: when the segment was last known complete
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    physical_id TEXT PRIMARY KEY,
+                    watermark INTEGER,
+                    synced REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value INTEGER)")
+            self._conn.commit()
+        return self._conn
+
+    def watermarks(self, physical_ids):
+        '''physical_id -> (watermark ms or None, synced time) for the ids the store has synced'''
+        physical_ids = [str(pid) for pid in physical_ids]
+        result = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(physical_ids), 500):
+                chunk = physical_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT physical_id, watermark, synced FROM watermarks WHERE physical_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                result.update((pid, (watermark, synced)) for pid, watermark, synced in rows)
+        return result
+
+    def _store(self, rows, synced_ids=(), advance_ids=None):
+        """
+        Append visits and move watermarks forward in one transaction.
+
+        Args:
+            rows (list): Socrata records with physical_id and date_visited.
+            synced_ids (iterable): Ids whose history is now complete; their synced time is set to now.
+            advance_ids (set, optional): Ids whose watermark may move to their newest visit in rows
+                (default: every id in rows).
+        """
+        # Records without a usable date_visited are dropped (NaT would be stored as the oldest possible visit)
+        visits = [(str(row['physical_id']), visited) for row in rows if (visited := _visit_ms(row)) is not None]
+        newest = {}
+        for pid, visited in visits:
+            if advance_ids is None or pid in advance_ids:
+                newest[pid] = max(visited, newest.get(pid, visited))
+
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO visits (physical_id, visited) VALUES (?, ?)", visits)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO watermarks (physical_id, watermark, synced) VALUES (?, NULL, 0)",
+                    [(pid,) for pid in set(newest) | set(synced_ids)]
+                )
+                conn.executemany(
+                    "UPDATE watermarks SET watermark = MAX(COALESCE(watermark, 0), ?) WHERE physical_id = ?",
+                    [(visited, pid) for pid, visited in newest.items()]
+                )
+                conn.executemany("UPDATE watermarks SET synced = ? WHERE physical_id = ?", [(now, pid) for pid in synced_ids])
+        return len(visits)
+
+    def sync(self, data_fetcher, physical_ids, force=False):
+        """
+        Bring the stored history of physical_ids up to date.
+
+        Segments synced within max_age are skipped. The rest are fetched with
+        date_visited > their watermark (the whole history the first time), grouping
+        segments that share a watermark into the same IN (...) queries.
+
+        Args:
+            data_fetcher (DataFetcher): Fetcher whose Socrata client is used.
+            physical_ids (list): Street segment physical IDs.
+            force (bool): Sync even segments that were synced recently.
+
+        Returns:
+            int: Number of visits fetched.
+        """
+        physical_ids = list(dict.fromkeys(str(pid) for pid in physical_ids if pid))
+        known = self.watermarks(physical_ids)
+        now = time.time()
+
+        by_watermark = {}
+        for pid in physical_ids:
+            watermark, synced = known.get(pid, (None, 0))
+            if force or now - synced > self.max_age:
+                by_watermark.setdefault(watermark, []).append(pid)
+
+        fetched = 0
+        for watermark, ids in by_watermark.items():
+            since_clause = "" if watermark is None else f" AND date_visited > {soql_quote(_from_ms(watermark))}"
+            for chunk_ids, where_clause in in_clause_chunks("physical_id", ids, since_clause):
+                # Store page by page; the segments are only marked synced after the last page
+                try:
+                    for page in data_fetcher.iter_pages(
+                        DATASET_IDS['sweep_nyc'],
+                        where=where_clause,
+                        select="physical_id, date_visited",
+                        order="date_visited, physical_id",
+                        cached=False
+                    ):
+                        fetched += self._store(page)
+                except Exception as e:
+                    print(f"Error syncing sweep data for {len(chunk_ids)} physical_ids: {e}")
+                    continue
+                self._store([], synced_ids=chunk_ids)
+        return fetched
+
+    def refresh_citywide(self, data_fetcher, since=None):
+        """
+        Fetch every segment's visits since the last citywide refresh with a single paged query.
+
+        Only segments whose history was already complete at `since` are marked current;
+        the others keep their watermark and catch up on their next sync.
+
+        Args:
+            data_fetcher (DataFetcher): Fetcher whose Socrata client is used.
+            since (str or datetime, optional): Start of the delta (default: the end of the
+                previous refresh, or one day before the newest stored visit).
+
+        Returns:
+            int: Number of visits fetched.
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM sync_state WHERE name = 'citywide_watermark'").fetchone()
+            if row is None:
+                row = conn.execute("SELECT MAX(watermark) - 86400000 FROM watermarks").fetchone()
+        if since is not None:
+            since_ms = _to_ms(soql_timestamp(since))
+        elif row and row[0] is not None:
+            since_ms = row[0]
+        else:
+            since_ms = _to_ms(np.datetime64('now', 'ms') - np.timedelta64(1, 'D'))
+
+        with self._lock:
+            current = {
+                pid for pid, watermark in self._connection().execute("SELECT physical_id, watermark FROM watermarks")
+                if watermark is not None and watermark >= since_ms
+            }
+
+        # The delta can be large, so it is stored one page at a time (bypassing the response cache)
+        fetched = 0
+        newest = since_ms
+        for page in data_fetcher.iter_pages(
+            DATASET_IDS['sweep_nyc'],
+            where=f"date_visited > {soql_quote(_from_ms(since_ms))}",
+            select="physical_id, date_visited",
+            order="date_visited, physical_id",
+            cached=False
+        ):
+            fetched += self._store(page, advance_ids=current)
+            newest = max([newest] + [visited for row in page if (visited := _visit_ms(row)) is not None])
+        self._store([], synced_ids=current)
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES ('citywide_watermark', ?)", (newest,))
+
+        print(f"Fetched {fetched} sweep visits since {_from_ms(since_ms)}; {len(current)} segments are current")
+        return fetched
+
+    def history(self, physical_id, limit=None):
+        '''Stored visit times of a segment as datetime64[ms], newest first'''
+        query = "SELECT visited FROM visits WHERE physical_id = ? ORDER BY visited DESC"
+        params = [str(physical_id)]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._connection().execute(query, params).fetchall()
+        return np.array([visited for (visited,) in rows], dtype=np.int64).astype('datetime64[ms]')
+
+    def visits(self, physical_ids):
+        """
+        Stored visits of many segments in one pass.
+
+        Args:
+            physical_ids (list): Street segment physical IDs.
+
+        Returns:
+            tuple: (np.ndarray of physical_ids, np.ndarray of datetime64[ms] visit times),
+            grouped by physical_id with each segment's newest visit first.
+        """
+        physical_ids = list(dict.fromkeys(str(pid) for pid in physical_ids if pid))
+        ids, visited = [], []
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(physical_ids), 500):
+                chunk = physical_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT physical_id, visited FROM visits WHERE physical_id IN ({','.join('?' * len(chunk))}) "
+                    "ORDER BY physical_id, visited DESC",
+                    chunk
+                ).fetchall()
+                ids.extend(pid for pid, _ in rows)
+                visited.extend(value for _, value in rows)
+        return np.array(ids, dtype=object), np.array(visited, dtype=np.int64).astype('datetime64[ms]')
+
+    def records(self, physical_id, limit=None):
+        '''Stored visits of a segment as Socrata-style records ({"physical_id", "date_visited"}), newest first'''
+        return [
+            {"physical_id": str(physical_id), "date_visited": str(visited)}
+            for visited in self.history(physical_id, limit)
+        ]
+
+
+sweep_store = SweepStore()
+
+
+if __name__ == "__main__":
+    import sys
+    from data.data_fetcher import DataFetcher
+
+    # python -m data.sweep_store [since]  -- pull the latest visits for every stored segment
+    sweep_store.refresh_citywide(DataFetcher(data_path=None), since=sys.argv[1] if len(sys.argv) > 1 else None)
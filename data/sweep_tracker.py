@@ -7,25 +7,52 @@ class SweepTracker:
 
     '''Main class for tracking street sweeping data'''
 
-    def __init__(self):
+    def __init__(self, address_mapper=None):
         self.data_fetcher = DataFetcher(data_path="/Users/nanabonsu/PythonProjects/SweepInsights/data/csvs")
-        self.address_mapper = AddressMapper()
+        self.address_mapper = address_mapper or AddressMapper()  # Can be shared between trackers
 
 
-#multiple records
-    def get_sweep_statuses(self, street_name, house_number, borough_code=None, num_records=1):
+    def resolve_physical_ids(self, addresses):
         '''
-        Returns the last `num_records` sweep statuses for a given address.
+        Resolve many addresses to physical_ids, using the cache and then bulk centerline queries.
 
         Args:
-            street_name: Street name (e.g., "Bleecker St")
-            house_number: House number
-            borough_code: Optional borough code (1-5)
-            num_records: Number of recent sweep records to return (default 1)
+            addresses: List of dictionaries with street_name, house_number and borough_code
 
         Returns:
-            If num_records == 1: Dictionary with sweep status information for the most recent sweep
-            If num_records > 1: List of dictionaries with sweep status information for each of the last `num_records` sweeps
+            List of physical_ids (None where an address could not be resolved), in input order
+        '''
+        physical_ids = [
+            self.address_mapper.get_cached_physical_id(a['street_name'], a['house_number'], a.get('borough_code'))
+            for a in addresses
+        ]
+
+        missing = [i for i, physical_id in enumerate(physical_ids) if not physical_id]
+        if not missing:
+            return physical_ids
+
+        segments = self.data_fetcher.get_street_centerline_bulk([addresses[i] for i in missing])
+
+        new_entries = []
+        for i, segment in zip(missing, segments):
+            if segment:
+                address = addresses[i]
+                physical_ids[i] = segment['physicalid']
+                new_entries.append((address['street_name'], address['house_number'], segment['physicalid'], address.get('borough_code')))
+
+        # Write all new mappings through to the cache at once
+        if new_entries:
+            self.address_mapper.cache_physical_ids(new_entries)
+
+        return physical_ids
+
+
+    def get_physical_id(self, street_name, house_number, borough_code=None):
+        '''
+        Resolve an address to its street segment physical_id.
+
+        Returns:
+            physical_id string, or None if the address is not in the centerline database
         '''
         # Try cache first
         physical_id = self.address_mapper.get_cached_physical_id(
@@ -43,11 +70,7 @@ class SweepTracker:
             print(f"Street centerline results: {results}")
 
             if not results:
-                error_result = {
-                    "status": "error",
-                    "message": "Address not found in NYC Street Centerline database"
-                }
-                return error_result if num_records == 1 else [error_result]
+                return None
 
             physical_id = results[0]['physicalid']
 
@@ -56,6 +79,32 @@ class SweepTracker:
                 street_name, house_number, physical_id, borough_code
             )
 
+        return physical_id
+
+#multiple records
+    def get_sweep_statuses(self, street_name, house_number, borough_code=None, num_records=1):
+        '''
+        Returns the last `num_records` sweep statuses for a given address.
+
+        Args:
+            street_name: Street name (e.g., "Bleecker St")
+            house_number: House number
+            borough_code: Optional borough code (1-5)
+            num_records: Number of recent sweep records to return (default 1)
+
+        Returns:
+            If num_records == 1: Dictionary with sweep status information for the most recent sweep
+            If num_records > 1: List of dictionaries with sweep status information for each of the last `num_records` sweeps
+        '''
+        physical_id = self.get_physical_id(street_name, house_number, borough_code)
+
+        if not physical_id:
+            error_result = {
+                "status": "error",
+                "message": "Address not found in NYC Street Centerline database"
+            }
+            return error_result if num_records == 1 else [error_result]
+
         # Get sweep data
         sweep_data_list = self.data_fetcher.get_sweep_data(physical_id, limit=num_records)
 
@@ -65,11 +114,19 @@ class SweepTracker:
         #     print(f"Sweep data entry: {entry}")
         #     #continuing from here??!
 
+        return self.build_sweep_statuses(sweep_data_list, street_name, house_number, physical_id, num_records)
 
+    def build_sweep_statuses(self, sweep_data_list, street_name, house_number, physical_id, num_records=1):
+        '''
+        Format sweep records (newest first) the way get_sweep_statuses returns them.
 
-        print(f"Sweep data list length: {len(sweep_data_list)}")
-
-
+        Args:
+            sweep_data_list: Sweep records from DataFetcher.get_sweep_data (may be None)
+            street_name: Street name
+            house_number: House number
+            physical_id: Street segment physical ID
+            num_records: Number of recent sweep records to return
+        '''
         if not sweep_data_list:
             no_data_result = {
 
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+import requests
+from config import TRANSPORT_MODE, TRANSPORT_ARCHIVE, TRANSPORT_REPLAY_LATENCY
+from .instrumentation import count
+
+TRANSPORT_MODES = ('live', 'record', 'replay')
+
+
+class ReplayMissError(LookupError):
+    '''A request that is not in the archive was made in replay mode'''
+
+
+class TransportArchive:
+    '''Request/response pairs stored zlib-compressed in one SQLite file'''
+
+    def __init__(self, archive_file=TRANSPORT_ARCHIVE):
+        self.archive_file = archive_file
+        self._conn = None
+        self._responses = None  # key -> response JSON text, loaded once for replay
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        '''Open (and create) the archive on first use'''
+        if self._conn is None:
+            Path(self.archive_file).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.archive_file, timeout=30, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS exchanges (
+                    key TEXT PRIMARY KEY,
+                    service TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    response BLOB NOT NULL,
+                    recorded REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(service, request):
+        '''Archive key of a request (a JSON-serializable dictionary)'''
+        raw = json.dumps([service, request], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def put(self, service, request, response):
+        '''Store (or overwrite) the response to a request'''
+        key = self.make_key(service, request)
+        text = json.dumps(response)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO exchanges (key, service, request, response, recorded) VALUES (?, ?, ?, ?, ?)",
+                (key, service, json.dumps(request, sort_keys=True, default=str), zlib.compress(text.encode('utf-8')), time.time())
+            )
+            conn.commit()
+            if self._responses is not None:
+                self._responses[key] = text
+
+    def get(self, service, request):
+        '''Recorded response to a request; raises ReplayMissError if it was never recorded'''
+        key = self.make_key(service, request)
+        with self._lock:
+            if self._responses is None:
+                # Decompress the whole archive once so replayed requests are a dictionary lookup
+                rows = self._connection().execute("SELECT key, response FROM exchanges").fetchall()
+                self._responses = {row_key: zlib.decompress(body).decode('utf-8') for row_key, body in rows}
+            text = self._responses.get(key)
+        if text is None:
+            raise ReplayMissError(f"No recorded {service} response for {json.dumps(request, default=str)[:200]}")
+        return json.loads(text)
+
+    def stats(self):
+        '''Number of exchanges and compressed bytes per service'''
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT service, COUNT(*), SUM(LENGTH(response)) FROM exchanges GROUP BY service"
+            ).fetchall()
+        return {service: {"exchanges": count, "bytes": nbytes} for service, count, nbytes in rows}
+
+
+class Transport:
+    '''Sends Socrata, Nominatim and SweepNYC requests live, records them to an archive, or replays them from it'''
+
+    def __init__(self, mode=TRANSPORT_MODE, archive_file=TRANSPORT_ARCHIVE, latency=TRANSPORT_REPLAY_LATENCY):
+        """
+        Initialize the Transport.
+
+        Args:
+            mode (str): 'live', 'record' (live, saving every response) or 'replay' (archive only).
+            archive_file (str): SQLite archive of recorded requests.
+            latency (float): Seconds added to every replayed response, to imitate the network.
+        """
+        self.archive = None
+        self.configure(mode, archive_file, latency)
+
+    def configure(self, mode=None, archive_file=None, latency=None):
+        '''Change the mode, archive or replay latency (e.g. from a benchmark or CLI flag)'''
+        if mode is not None:
+            if mode not in TRANSPORT_MODES:
+                raise ValueError(f"Unknown transport mode {mode!r}; expected one of {TRANSPORT_MODES}")
+            self.mode = mode
+        if archive_file is not None and (self.archive is None or archive_file != self.archive.archive_file):
+            self.archive = TransportArchive(archive_file)
+        if latency is not None:
+            self.latency = latency
+
+    def call(self, service, request, fetch):
+        """
+        Answer a request according to the mode.
+
+        Args:
+            service (str): Service name (e.g. 'socrata').
+            request (dict): JSON-serializable description of the request, used as the archive key.
+            fetch (callable): Performs the request live and returns its JSON-serializable response.
+
+        Returns:
+            The response.
+        """
+        count('http_calls', service=service, mode=self.mode)
+        if self.mode == 'live':
+            return fetch()
+        if self.mode == 'record':
+            response = fetch()
+            self.archive.put(service, request, response)
+            return response
+
+        response = self.archive.get(service, request)
+        if self.latency:
+            time.sleep(self.latency)
+        return response
+
+    def get_json(self, url, params=None, timeout=10, ignore_params=(), service='http'):
+        """
+        GET a URL and return its decoded JSON body (requests.get, raise_for_status, json).
+
+        Args:
+            url (str): URL to request.
+            params (dict, optional): Query parameters.
+            timeout (float): Request timeout in seconds.
+            ignore_params (tuple): Parameters left out of the archive key (e.g. cache-busting timestamps).
+            service (str): Service name the request is archived and counted under.
+
+        Returns:
+            The decoded JSON body.
+        """
+        def fetch():
+            response = requests.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+
+        key_params = {name: value for name, value in (params or {}).items() if name not in ignore_params}
+        return self.call(service, {"url": url, "params": key_params}, fetch)
+
+
+class TransportSocrata:
+    '''Wraps a Socrata client so its get() calls go through a Transport'''
+
+    def __init__(self, client, transport):
+        self.client = client
+        self.transport = transport
+
+    def __getattr__(self, name):
+        # Everything except get() goes straight to the wrapped client
+        return getattr(self.client, name)
+
+    def get(self, dataset_identifier, **kwargs):
+        '''Same as Socrata.get, recorded or replayed according to the transport mode'''
+        request = {"dataset": dataset_identifier, **{name: value for name, value in kwargs.items() if value is not None}}
+        return self.transport.call('socrata', request, lambda: self.client.get(dataset_identifier, **kwargs))
+
+
+# Shared by every DataFetcher, the geocoder and the SweepNYC client in the process
+transport = Transport()
+
+
+if __name__ == "__main__":
+    for service, stats in transport.archive.stats().items():
+        print(f"{service}: {stats['exchanges']} exchanges, {stats['bytes'] / 1024:.1f} KB compressed")
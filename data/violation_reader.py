@@ -0,0 +1,98 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from config import VIOLATION_COLUMNS, VIOLATION_CSV_DTYPES, VIOLATION_CHUNK_ROWS
+from .street_names import canonical_street_name
+from .house_numbers import house_number_key, house_number_keys
+from .instrumentation import registry, count
+
+
+def _street_mask(street_names, street):
+    '''Rows whose canonical street name is `street` (each distinct name is canonicalized once)'''
+    codes, uniques = pd.factorize(street_names)
+    matches = np.array([canonical_street_name(name) == street for name in uniques] + [False], dtype=bool)
+    return matches[codes]  # code -1 (missing) picks the trailing False
+
+
+def read_violations_filtered(csv_path, street_name=None, violation_code=None, block_range=None,
+                             columns=None, chunk_rows=VIOLATION_CHUNK_ROWS, report=True):
+    """
+    Read the violations of one street/block from a large CSV without loading the whole file.
+
+    The file is read chunk_rows rows at a time with only the needed columns and explicit
+    dtypes; each chunk is filtered and only the matching rows are kept, so peak memory
+    depends on the chunk size and the size of the result, not on the size of the file.
+
+    Args:
+        csv_path (str): Path to a borough or citywide violations CSV.
+        street_name (str, optional): Street to keep (matched after normalization).
+        violation_code (int, optional): Violation code to keep (e.g. 21 for street cleaning).
+        block_range (tuple, optional): (low, high) house numbers to keep, inclusive.
+        columns (list, optional): Columns to return (defaults to VIOLATION_COLUMNS).
+        chunk_rows (int): Rows per chunk.
+        report (bool): Print rows scanned, rows kept and rows scanned per second.
+
+    Returns:
+        pd.DataFrame: Matching rows. frame.attrs['scan'] holds rows_scanned, rows_kept,
+        seconds and rows_per_second.
+    """
+    columns = list(columns or VIOLATION_COLUMNS)
+    needed = set(columns)
+    if street_name is not None:
+        needed.add('Street Name')
+    if violation_code is not None:
+        needed.add('Violation Code')
+    if block_range:
+        needed.add('House Number')
+
+    street = canonical_street_name(street_name) if street_name is not None else None
+    low = high = None
+    if block_range:
+        low, high = house_number_key(block_range[0]), house_number_key(block_range[1])
+
+    start = time.perf_counter()
+    rows_scanned = 0
+    kept = []
+    reader = pd.read_csv(
+        csv_path,
+        usecols=lambda c: c in needed,
+        dtype={c: dtype for c, dtype in VIOLATION_CSV_DTYPES.items() if c in needed},
+        chunksize=chunk_rows
+    )
+    with reader:
+        for chunk in reader:
+            rows_scanned += len(chunk)
+            mask = np.ones(len(chunk), dtype=bool)
+            if street is not None:
+                mask &= _street_mask(chunk['Street Name'], street)
+            if violation_code is not None:
+                mask &= (chunk['Violation Code'] == int(violation_code)).fillna(False).to_numpy(dtype=bool)
+            if block_range:
+                if low is None or high is None:
+                    mask[:] = False
+                else:
+                    keys = house_number_keys(chunk['House Number'].where(mask))
+                    mask &= (keys >= low) & (keys <= high)
+            if mask.any():
+                kept.append(chunk.loc[mask, [c for c in columns if c in chunk.columns]])
+
+    seconds = time.perf_counter() - start
+    count('rows_scanned', rows_scanned, source='csv')
+    if registry.enabled:
+        count('bytes_read', os.path.getsize(csv_path), source='csv')
+    if kept:
+        result = pd.concat(kept, ignore_index=True)
+    else:
+        result = pd.DataFrame(columns=columns)
+
+    result.attrs['scan'] = {
+        "rows_scanned": rows_scanned,
+        "rows_kept": len(result),
+        "seconds": round(seconds, 3),
+        "rows_per_second": int(rows_scanned / seconds) if seconds > 0 else 0,
+    }
+    if report:
+        print(f"Scanned {rows_scanned} rows of {csv_path} in {seconds:.2f}s "
+              f"({result.attrs['scan']['rows_per_second']} rows/s), kept {len(result)}")
+    return result
@@ -0,0 +1,148 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from config import VIOLATION_COLUMNS
+from .house_numbers import house_number_keys
+from .violation_times import decode_violation_times
+
+# Column dtypes of a loaded violations frame. 'House Key' and 'Violation Minute' are
+# derived from 'House Number' and 'Violation Time', whose original text is kept as categories.
+VIOLATION_SCHEMA = {
+    'Street Name': 'category',
+    'Violation County': 'category',
+    'Violation Code': 'Int16',
+    'House Number': 'category',
+    'House Key': 'int64',
+    'Issue Date': 'datetime64[s]',
+    'Violation Time': 'category',
+    'Violation Minute': 'int16',
+}
+
+# The CSV exports write MM/DD/YYYY; Socrata returns ISO 8601 and older exports use 2-digit years
+ISSUE_DATE_FORMATS = ['%m/%d/%Y', 'ISO8601', '%m/%d/%y']
+
+
+def _as_category(series):
+    '''Series as a categorical (text columns repeat a few thousand distinct values)'''
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype('category')
+
+
+def _map_categories(series, convert, missing):
+    '''Apply convert() to the categories of a categorical once and broadcast the result over the rows'''
+    converted = np.append(np.asarray(convert(series.cat.categories)), missing)
+    return converted[series.cat.codes.to_numpy()]  # code -1 (missing) picks `missing`
+
+
+def parse_issue_dates(values):
+    """
+    Parse Issue Date text, trying each of ISSUE_DATE_FORMATS on the values the previous ones left unparsed.
+
+    Args:
+        values (array-like): Date strings.
+
+    Returns:
+        np.ndarray: datetime64[s] dates, NaT where no format matched.
+    """
+    values = pd.Index(values, dtype=object)
+    dates = np.full(len(values), np.datetime64('NaT', 's'))
+    for date_format in ISSUE_DATE_FORMATS:
+        unparsed = np.isnat(dates)
+        if not unparsed.any():
+            break
+        dates[unparsed] = pd.to_datetime(values[unparsed], format=date_format, errors='coerce').to_numpy('datetime64[s]')
+    return dates
+
+
+def apply_violation_schema(frame):
+    """
+    Convert a violations frame to VIOLATION_SCHEMA.
+
+    Columns that are not in the frame are skipped; 'House Key' and 'Violation Minute'
+    are added when 'House Number' and 'Violation Time' are present.
+
+    Args:
+        frame (pd.DataFrame): Violations as read from a CSV or the violation store.
+
+    Returns:
+        pd.DataFrame: A new frame using the schema dtypes.
+    """
+    data = {}
+    for column in frame.columns:
+        series = frame[column]
+        if column in ('Street Name', 'Violation County'):
+            data[column] = _as_category(series)
+        elif column == 'Violation Code':
+            data[column] = pd.to_numeric(series, errors='coerce').astype('Int16')
+        elif column == 'House Number':
+            data[column] = _as_category(series)
+            data['House Key'] = _map_categories(data[column], house_number_keys, np.int64(-1))
+        elif column == 'Issue Date':
+            if pd.api.types.is_datetime64_any_dtype(series):
+                data[column] = series.astype('datetime64[s]')
+            else:
+                categories = _as_category(series)
+                dates = _map_categories(categories, parse_issue_dates, np.datetime64('NaT', 's'))
+                # Non-blank dates no format could parse are reported rather than silently left as NaT
+                blank = categories.cat.categories.astype(str).str.strip() == ''
+                unparsed = _map_categories(categories, lambda values: ~blank, False) & np.isnat(dates)
+                if unparsed.any():
+                    examples = ', '.join(repr(value) for value in pd.unique(series[unparsed])[:3])
+                    print(f"Could not parse {int(unparsed.sum())} Issue Date values (e.g. {examples}); they are left empty.")
+                data[column] = dates
+        elif column == 'Violation Time':
+            data[column] = _as_category(series)
+            data['Violation Minute'] = _map_categories(
+                data[column], lambda values: decode_violation_times(values)[0], np.int16(-1)
+            )
+        else:
+            data[column] = series
+
+    return pd.DataFrame(data, index=frame.index)
+
+
+def memory_report(frame, label=""):
+    """
+    Compare the memory of a frame before and after apply_violation_schema.
+
+    Args:
+        frame (pd.DataFrame): Violations loaded with default dtypes.
+        label (str): Name printed with the report (e.g. the borough).
+
+    Returns:
+        dict: Column -> {"before": bytes, "after": bytes}, plus a "total" entry.
+    """
+    after_frame = apply_violation_schema(frame)
+    before = frame.memory_usage(deep=True, index=False)
+    after = after_frame.memory_usage(deep=True, index=False)
+
+    report = {}
+    for column in after_frame.columns:
+        report[column] = {"before": int(before.get(column, 0)), "after": int(after[column])}
+    report["total"] = {"before": int(before.sum()), "after": int(after.sum())}
+
+    print(f"Memory for {label or 'violations'} ({len(frame)} rows):")
+    for column, sizes in report.items():
+        change = f"{sizes['before'] / sizes['after']:.1f}x" if sizes["before"] and sizes["after"] else "derived"
+        print(f"  {column:<18} {sizes['before'] / 1024 ** 2:>9.1f} MB -> {sizes['after'] / 1024 ** 2:>8.1f} MB ({change})")
+    return report
+
+
+def memory_report_for_boroughs(data_path, columns=None):
+    '''Print memory_report for every borough violations CSV in data_path'''
+    reports = {}
+    for file_name in sorted(os.listdir(data_path)):
+        if file_name.endswith('StreetCleaningViolations.csv'):
+            wanted = set(columns or VIOLATION_COLUMNS)
+            frame = pd.read_csv(os.path.join(data_path, file_name), usecols=lambda c: c in wanted, low_memory=False)
+            reports[file_name] = memory_report(frame, label=file_name)
+    return reports
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m data.violation_schema <csv directory>")
+        sys.exit(1)
+    memory_report_for_boroughs(sys.argv[1], columns=VIOLATION_COLUMNS + ['Violation County'])
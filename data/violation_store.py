@@ -0,0 +1,165 @@
+import json
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from config import VIOLATION_STORE_DIR, VIOLATION_COLUMNS
+from .instrumentation import registry, count
+
+
+class ViolationStore:
+    '''Keeps memory-mapped NumPy copies of the borough violation CSVs'''
+
+    META_FILE = 'meta.json'
+
+    def __init__(self, store_dir=VIOLATION_STORE_DIR, columns=None):
+        """
+        Initialize the ViolationStore.
+
+        Args:
+            store_dir (str): Directory where converted borough files are written.
+            columns (list, optional): CSV columns to convert (defaults to VIOLATION_COLUMNS).
+        """
+        self.store_dir = store_dir
+        self.columns = list(columns or VIOLATION_COLUMNS)
+
+    def _store_path(self, csv_path):
+        '''Directory holding the converted columns for a CSV file'''
+        return Path(self.store_dir) / Path(csv_path).stem
+
+    def _column_file(self, column):
+        '''File name stem for a column (e.g. "Street Name" -> "street_name")'''
+        return column.strip().lower().replace(' ', '_')
+
+    def _read_meta(self, csv_path):
+        '''Read the conversion metadata, or None if the store was never built'''
+        meta_path = self._store_path(csv_path) / self.META_FILE
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def source_version(self, csv_path):
+        '''Version of a CSV file, based on its mtime and size'''
+        stat = os.stat(csv_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def is_current(self, csv_path):
+        '''True if the store exists and was built from the current CSV contents'''
+        meta = self._read_meta(csv_path)
+        if not meta:
+            return False
+        mtime_ns, size = self.source_version(csv_path)
+        return meta.get('mtime_ns') == mtime_ns and meta.get('size') == size
+
+    def convert(self, csv_path):
+        """
+        Convert a borough CSV file into one .npy file per column.
+
+        Text columns are dictionary encoded: an int32 codes array (memory mapped
+        on load) plus the array of distinct values. Numeric columns are stored as is.
+
+        Args:
+            csv_path (str): Path to the borough CSV file.
+
+        Returns:
+            dict: The metadata written for the converted store.
+        """
+        mtime_ns, size = self.source_version(csv_path)
+        wanted = set(self.columns)
+        df = pd.read_csv(csv_path, usecols=lambda c: c in wanted, low_memory=False)
+        count('rows_scanned', len(df), source='csv')
+        count('bytes_read', size, source='csv')
+
+        store_path = self._store_path(csv_path)
+        store_path.mkdir(parents=True, exist_ok=True)
+
+        columns = {}
+        for column in df.columns:
+            name = self._column_file(column)
+            series = df[column]
+            if pd.api.types.is_numeric_dtype(series):
+                np.save(store_path / f"{name}.npy", series.to_numpy())
+                columns[column] = {"kind": "plain", "file": name}
+            else:
+                codes, uniques = pd.factorize(series.astype(str).where(series.notna()))
+                np.save(store_path / f"{name}.codes.npy", codes.astype(np.int32))
+                np.save(store_path / f"{name}.values.npy", np.asarray(uniques, dtype=str))
+                columns[column] = {"kind": "dict", "file": name}
+
+        meta = {
+            "source": str(csv_path),
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "rows": len(df),
+            "columns": columns,
+        }
+
+        # Write the metadata last so a half-written store is never treated as current
+        tmp_path = store_path / f"{self.META_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, store_path / self.META_FILE)
+
+        print(f"Converted {len(df)} rows from {csv_path} into {store_path}")
+        return meta
+
+    def load(self, csv_path, columns=None):
+        """
+        Load violation data for a CSV file from the columnar store.
+
+        The store is (re)built first if it is missing or the CSV has changed.
+
+        Args:
+            csv_path (str): Path to the borough CSV file.
+            columns (list, optional): Columns to read (defaults to all stored columns).
+
+        Returns:
+            pd.DataFrame: DataFrame with the requested columns (text columns as categoricals).
+        """
+        meta = self._read_meta(csv_path) if self.is_current(csv_path) else None
+        if meta is None:
+            meta = self.convert(csv_path)
+
+        store_path = self._store_path(csv_path)
+        wanted = columns or list(meta['columns'])
+
+        data = {}
+        for column in wanted:
+            info = meta['columns'].get(column)
+            if info is None:
+                continue
+            name = info['file']
+            if registry.enabled:
+                files = [f"{name}.npy"] if info['kind'] == 'plain' else [f"{name}.codes.npy", f"{name}.values.npy"]
+                count('bytes_read', sum(os.path.getsize(store_path / file) for file in files), source='violation_store')
+            if info['kind'] == 'plain':
+                data[column] = np.load(store_path / f"{name}.npy", mmap_mode='r')
+            else:
+                codes = np.load(store_path / f"{name}.codes.npy", mmap_mode='r')
+                values = np.load(store_path / f"{name}.values.npy")
+                # The stored codes already are categorical codes; missing values are code -1
+                data[column] = pd.Categorical.from_codes(codes, categories=values.astype(object))
+
+        return pd.DataFrame(data, columns=[c for c in wanted if c in data])
+
+
+def convert_all(data_path, store_dir=VIOLATION_STORE_DIR):
+    '''Convert every borough violation CSV found in data_path'''
+    store = ViolationStore(store_dir)
+    for file_name in sorted(os.listdir(data_path)):
+        if file_name.endswith('StreetCleaningViolations.csv'):
+            csv_path = os.path.join(data_path, file_name)
+            if store.is_current(csv_path):
+                print(f"Store is up to date for {csv_path}")
+            else:
+                store.convert(csv_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m data.violation_store <csv directory>")
+        sys.exit(1)
+    convert_all(sys.argv[1])
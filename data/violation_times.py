@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# Minute-of-day value used for violation times that could not be decoded
+MISSING_MINUTE = -1
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def decode_violation_times(violation_times):
+    """
+    Decode raw 'Violation Time' values ('HHMMA' / 'HHMMP', e.g. '0157A') into minutes since midnight.
+
+    The whole column is decoded in one NumPy pass over its bytes; malformed values are
+    counted and set to MISSING_MINUTE instead of being logged one by one.
+
+    Args:
+        violation_times (pd.Series or array-like): Raw violation time column.
+
+    Returns:
+        tuple: (np.ndarray of int16 minutes, int number of malformed values)
+    """
+    series = pd.Series(violation_times)
+    if len(series) == 0:
+        return np.array([], dtype=np.int16), 0
+
+    # Decode each distinct value once when the column repeats values (it nearly always does)
+    codes, uniques = pd.factorize(series)
+    if len(uniques) < len(series):
+        unique_minutes, _ = decode_violation_times(np.asarray(uniques, dtype=object))
+        minutes = np.append(unique_minutes, np.int16(MISSING_MINUTE))[codes]
+        return minutes, int(np.count_nonzero(minutes == MISSING_MINUTE))
+
+    # Fixed-width bytes: one extra byte so values longer than 5 characters are detected
+    text = series.astype(str).str.strip().str.upper().to_numpy(dtype='S6')
+    raw = text.view(np.uint8).reshape(len(text), 6)
+
+    digits = raw[:, :4].astype(np.int16) - ord('0')
+    period = raw[:, 4]
+    valid = (
+        np.all((digits >= 0) & (digits <= 9), axis=1)
+        & ((period == ord('A')) | (period == ord('P')))
+        & (raw[:, 5] == 0)
+        & series.notna().to_numpy()
+    )
+
+    hours = digits[:, 0] * 10 + digits[:, 1]
+    minutes = digits[:, 2] * 10 + digits[:, 3]
+    valid &= (hours <= 12) & (minutes < 60)
+
+    # 12xxA is just after midnight and 12xxP just after noon
+    minutes_of_day = (hours % 12) * 60 + minutes + np.where(period == ord('P'), 720, 0)
+    minutes_of_day = np.where(valid, minutes_of_day, MISSING_MINUTE).astype(np.int16)
+    return minutes_of_day, int(np.count_nonzero(~valid))
+
+
+def minutes_of_day(value):
+    '''Minutes since midnight for a datetime/time or an "HH:MM" string'''
+    if isinstance(value, str):
+        hours, minutes = value.strip().split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(minutes, twelve_hour=False):
+    '''Format minutes since midnight as "HH:MM" (or "HH:MM AM/PM")'''
+    hours, minutes = divmod(int(minutes) % MINUTES_PER_DAY, 60)
+    if twelve_hour:
+        return f"{(hours % 12) or 12:02}:{minutes:02} {'AM' if hours < 12 else 'PM'}"
+    return f"{hours:02}:{minutes:02}"
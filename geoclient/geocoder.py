@@ -0,0 +1,139 @@
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from geopy.geocoders import Nominatim
+from geopy.exc import GeocoderUnavailable, GeocoderTimedOut
+from config import (
+    NOMINATIM_DOMAIN, NOMINATIM_SCHEME, NOMINATIM_REQUESTS_PER_SECOND,
+    GEOCODE_CACHE_DB, GEOCODE_NEGATIVE_TTL, GEOCODE_RETRIES, ENABLE_CACHE
+)
+from data.service_limits import service_slot
+from data.transport import transport
+from data.instrumentation import count
+from data.street_names import canonical_street_name
+from .rate_limiter import TokenBucket
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Shared by every thread so Nominatim sees at most NOMINATIM_REQUESTS_PER_SECOND from this process
+nominatim_rate_limiter = TokenBucket(NOMINATIM_REQUESTS_PER_SECOND)
+
+_geolocator = None
+_geolocator_lock = threading.Lock()
+
+
+def get_geolocator():
+    '''The process-wide Nominatim client, created on first use'''
+    global _geolocator
+    with _geolocator_lock:
+        if _geolocator is None:
+            _geolocator = Nominatim(user_agent="sweepnyc_lookup", timeout=10, domain=NOMINATIM_DOMAIN, scheme=NOMINATIM_SCHEME)
+        return _geolocator
+
+
+def normalize_address(address):
+    '''Cache key for an address string (e.g. "2025 Valentine Avenue, Bronx, NY" -> "2025 VALENTINE AVE, BRONX, NY")'''
+    parts = [_WHITESPACE.sub(' ', part).strip() for part in str(address).split(',')]
+    return ', '.join(canonical_street_name(part) for part in parts if part)
+
+
+class GeocodeCache:
+    '''Persistent cache of geocoding results keyed by normalized address; "not found" results expire'''
+
+    def __init__(self, db_file=GEOCODE_CACHE_DB, negative_ttl=GEOCODE_NEGATIVE_TTL):
+        self.db_file = db_file
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        '''Open (and create) the SQLite database on first use'''
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS geocodes (
+                    address TEXT PRIMARY KEY,
+                    latitude REAL,
+                    longitude REAL,
+                    created REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, address):
+        '''Return (found, (lat, lon) or None); found is False if never geocoded or a "not found" result expired'''
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT latitude, longitude, created FROM geocodes WHERE address = ?", (normalize_address(address),)
+            ).fetchone()
+        if row is None:
+            return False, None
+        latitude, longitude, created = row
+        if latitude is None:
+            # A miss may be transient (or fixed upstream), so it is retried once it expires
+            return (True, None) if time.time() - created <= self.negative_ttl else (False, None)
+        return True, (latitude, longitude)
+
+    def put(self, address, coordinates):
+        '''Store a geocoding result; coordinates=None records that the address was not found'''
+        latitude, longitude = coordinates if coordinates else (None, None)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO geocodes (address, latitude, longitude, created) VALUES (?, ?, ?, ?)",
+                    (normalize_address(address), latitude, longitude, time.time())
+                )
+
+
+geocode_cache = GeocodeCache()
+
+
+def geocode_address(address):
+    """
+    Geocode an address, answering from the persistent cache when possible.
+
+    Network lookups go through the shared Nominatim client and the process-wide rate limiter;
+    unavailable/timed out lookups are retried up to GEOCODE_RETRIES times with backoff.
+
+    Args:
+        address (str): Address such as "2025 Valentine Ave, Bronx, NY".
+
+    Returns:
+        tuple or None: (latitude, longitude), or None if the address could not be geocoded.
+
+    Raises:
+        GeocoderUnavailable: If the service is still unavailable after the retries.
+    """
+    if ENABLE_CACHE:
+        found, coordinates = geocode_cache.get(address)
+        count('cache_hits' if found else 'cache_misses', cache='geocode')
+        if found:
+            return coordinates
+
+    def fetch():
+        nominatim_rate_limiter.acquire()
+        with service_slot('nominatim'):
+            location = get_geolocator().geocode(address)
+        return [location.latitude, location.longitude] if location else None
+
+    for attempt in range(GEOCODE_RETRIES + 1):
+        try:
+            # Live, recorded or replayed per TRANSPORT_MODE (replay skips the rate limiter)
+            coordinates = transport.call('nominatim', {"address": normalize_address(address)}, fetch)
+            break
+        except (GeocoderUnavailable, GeocoderTimedOut):
+            if attempt == GEOCODE_RETRIES:
+                raise
+            print("Geocoding service is unavailable. Retrying...")
+            time.sleep(2 ** attempt)
+
+    coordinates = tuple(coordinates) if coordinates else None
+    if ENABLE_CACHE:
+        geocode_cache.put(address, coordinates)
+    return coordinates
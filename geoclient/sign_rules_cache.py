@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from config import SIGN_RULES_CACHE_DB, SIGN_RULES_GEOHASH_PRECISION, SIGN_RULES_CACHE_TTL
+from data.instrumentation import count
+from data.street_names import canonical_street_name
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(latitude, longitude, precision=SIGN_RULES_GEOHASH_PRECISION):
+    '''Geohash of a point (e.g. (40.8665, -73.8929) -> "dr72qx8" at precision 7)'''
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    use_lon = True
+
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if use_lon else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            bounds[0] = middle
+        else:
+            bits <<= 1
+            bounds[1] = middle
+        use_lon = not use_lon
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def sign_rules_key(street_name, cell):
+    '''Cache key of a street within a geohash cell (a cell usually spans several streets)'''
+    return f"{canonical_street_name(street_name)}|{cell}"
+
+
+class SignRulesCache:
+    '''Persistent cache of parsed SweepNYC sign rules keyed by street and geohash cell, with a TTL'''
+
+    def __init__(self, db_file=SIGN_RULES_CACHE_DB, ttl=SIGN_RULES_CACHE_TTL):
+        self.db_file = db_file
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._key_locks = {}
+
+    def _connection(self):
+        '''Open (and create) the SQLite database on first use'''
+        if self._conn is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS street_sign_rules (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key):
+        '''Cached result for a key, or None if missing or older than the TTL'''
+        with self._lock:
+            row = self._connection().execute("SELECT result, created FROM street_sign_rules WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        '''Store the parsed result for a key'''
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO street_sign_rules (key, result, created) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), time.time())
+                )
+
+    def get_or_fetch(self, street_name, cell, fetch):
+        """
+        Return the cached result for a street within a cell, calling fetch() on a miss.
+
+        The result is stored under the requested street even when SweepNYC names another one
+        (at corners the nearest sign is often on the cross street), so the address's next
+        lookup is a hit. Concurrent misses for the same key wait for one fetch. Results
+        containing an "error" key are returned but not cached.
+
+        Args:
+            street_name (str): Street of the address being looked up.
+            cell (str): Geohash cell of the address.
+            fetch (callable): Returns the parsed sign rules for the address.
+
+        Returns:
+            dict: Parsed sign rules.
+        """
+        key = sign_rules_key(street_name, cell)
+        result = self.get(key)
+        count('cache_hits' if result is not None else 'cache_misses', cache='sign_rules')
+        if result is not None:
+            return result
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            result = self.get(key)
+            if result is None:
+                result = fetch()
+                if "error" not in result:
+                    self.put(key, result)
+
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return result
+
+
+sign_rules_cache = SignRulesCache()
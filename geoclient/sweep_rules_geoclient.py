@@ -1,35 +1,53 @@
-import requests
 import json
 import time
-from  geopy.geocoders import Nominatim
-from geopy.exc import GeocoderUnavailable
+from geopy.exc import GeocoderUnavailable, GeocoderTimedOut
+from config import SWEEPNYC_API_URL, BOROUGH_CODES
+from data.service_limits import service_slot
+from data.transport import transport, ReplayMissError
+from data.instrumentation import timed
+from .geocoder import geocode_address
+from .sign_rules_cache import sign_rules_cache, geohash_encode
 
 
 # Fetching the sweep rules statement for a given address
+@timed()
 def get_sweep_rules_by_address(house_number, street_name, borough="Bronx"):
+    # Accept borough codes (e.g. 2) as well as names
+    borough_names = {code: name.title() for name, code in BOROUGH_CODES.items()}
+    borough = borough_names.get(str(borough), borough)
+
     address = f"{house_number} {street_name}, {borough}, NY"
     print(f"Looking up address: {address}")
 
-    # Step 2. Geocode the address
-    geolocator = Nominatim(user_agent="sweepnyc_lookup", timeout=10)  # Increased timeout
-
+    # Step 2. Geocode the address (cached, shared client, rate limited)
     try:
-        location = geolocator.geocode(address)
-    except GeocoderUnavailable:
-        print("Geocoding service is unavailable. Retrying...")
-        time.sleep(1)  # Add delay before retrying
-        try:
-            location = geolocator.geocode(address)
-        except GeocoderUnavailable:
-            return {"error": f"Could not geocode address: {address}"}
+        location = geocode_address(address)
+    except (GeocoderUnavailable, GeocoderTimedOut, ReplayMissError):
+        return {"error": f"Could not geocode address: {address}"}
 
     if not location:
         return {"error": f"Could not geocode address: {address}"}
 
-    lat, lon = location.latitude, location.longitude
+    lat, lon = location
+
+    # Step 3. Sign rules for this street in the surrounding grid cell, fetched once per street, cell and TTL
+    cell = geohash_encode(lat, lon)
+    rules_info = sign_rules_cache.get_or_fetch(street_name, cell, lambda: _fetch_sign_rules(lat, lon))
+    if "error" in rules_info:
+        return rules_info
+
+    return {"address": address, **rules_info}
+
+
+def _fetch_sign_rules(lat, lon):
+    """
+    Call the SweepNYC API for a point and parse the cleaning rules out of its response.
 
-    # Step 3. Call SweepNYC API
-    url = "https://sweepnyc.nyc.gov/mappingapi/api/highlight/sweepinfo"
+    Returns:
+        dict: "street" and "rules", or "rules" and "info" when there are no rules,
+        or "error" if the request failed.
+    """
+    url = SWEEPNYC_API_URL
     params = {
         "lat": lat,
         "lon": lon,
@@ -38,16 +56,16 @@ def get_sweep_rules_by_address(house_number, street_name, borough="Bronx"):
     }
 
     try:
-        r = requests.get(url, params=params, timeout=10)  # Increased timeout for API request
-        r.raise_for_status()
-        data = r.json()
+        with service_slot('sweepnyc'):
+            # Recorded/replayed per TRANSPORT_MODE; the cache-busting timestamp is left out of the archive key
+            data = transport.get_json(url, params=params, timeout=10, ignore_params=("t",), service="sweepnyc")  # Increased timeout for API request
     except Exception as e:
         return {"error": f"Failed to fetch data: {e}"}
 
-    # Step 4. Parse JSON response
+    # Parse JSON response
     notes = data.get("Notes")
     if not notes:
-        return {"address": address, "rules": [], "info": "No cleaning rules found"}
+        return {"rules": [], "info": "No cleaning rules found"}
 
     try:
         notes_json = json.loads(notes)
@@ -56,9 +74,7 @@ def get_sweep_rules_by_address(house_number, street_name, borough="Bronx"):
     except Exception:
         rules = ["Error parsing cleaning rules"]
 
-    # Step 5. Return structured results
     return {
-        "address": address,
         "street": data.get("Street"),
         "rules": rules,
     }
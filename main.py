@@ -2,12 +2,10 @@ from pathlib import Path
 import sys
 import os
 from data.addresses import TEST_ADDRESSES # Import the test addresses
-from data.visualizations import visualize_ticket_likelihood
 from typing import List, Dict, Optional
 
 # Ensure project root (parent of this package dir) is on sys.path so `import data.*` works
 _project_root = Path(__file__).resolve().parent.parent
-print(f"Project root directory: {_project_root}")  # Add this line to print the project root
 
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
@@ -16,8 +14,9 @@ if str(_project_root) not in sys.path:
 os.environ.setdefault("PYTHONPATH", str(_project_root))
 
 from data.sweep_tracker import SweepTracker
-from config import BOROUGH_CODES
-from geoclient.sweep_rules_geoclient import get_sweep_rules_by_address # Import the function
+from config import BOROUGH_CODES, BATCH_WORKERS
+from data.batch_pipeline import run_batch
+from data.segment_context import SegmentContext
 from data_analysis import get_most_likely_sweep_time_range, calculate_ticket_likelihood_after_sweep
 
 
@@ -29,25 +28,33 @@ def check_street_status(
     tracker: SweepTracker, 
     full_street_name: str, 
     house_number: str, 
-    borough_code: str
+    borough_code: str,
+    context: Optional[SegmentContext] = None
 ) -> Optional[Dict[str, str]]:
-    """Check the street sweeping status for a given address."""
+    """Check the street sweeping status for a given address.
+
+    Pass a SegmentContext to reuse data already fetched for the address.
+    """
    # print("Example 1: Check when a street was last swept")
    # print("-" * 60)
 
-    info = get_sweep_rules_by_address(house_number, full_street_name,borough_code)
-    print(info["rules"][0])
+    context = context or SegmentContext(tracker, full_street_name, house_number, borough_code)
+
+    info = context.sign_rules
+    if info.get("rules"):
+        print(info["rules"][0])
 
 
         # Check sweep status for the address
-    result = tracker.get_sweep_statuses(full_street_name, house_number, borough_code, num_records=1000)
+    result = context.sweep_statuses(num_records=1000)
     print(result)
 
 
     times = []
     result_arr = {}
     if result[0].get("last_swept"):
-        times = [entry['last_swept'].split('T')[1].split(':')[0] + ':' + entry['last_swept'].split('T')[1].split(':')[1] for entry in result]
+        # Raw ISO date_visited values; the histogram reads the time of day out of them directly
+        times = [entry['last_swept'] for entry in result if entry.get('last_swept')]
         print("Number of sweep records retrieved:", len(times))
        # print(times)
 
@@ -55,6 +62,9 @@ def check_street_status(
 
         # Analyze most likely sweep time range and print results
         result_arr = get_most_likely_sweep_time_range(times)
+        if result_arr.get("status") != "success":
+            print(f"Could not analyze sweep times: {result_arr.get('message')}")
+            return None
 
         print(f"Most common interval: {result_arr['most_common']['interval']} "
               f"(Frequency: {result_arr['most_common']['frequency']}, "
@@ -83,30 +93,75 @@ def fetch_parking_violations(
         print("No recent parking violations found.")
 
 
+def analyze_address(tracker: SweepTracker, address: Dict[str, str]) -> Dict[str, str]:
+    """Run the sweep time and ticket likelihood analysis for one address."""
+    full_street_name = address['street_name']
+    house_number = address['house_number']
+    borough_code = address['borough_code']
+
+    # One context per address, so both analyses share the centerline, sweep and sign lookups
+    context = SegmentContext(tracker, full_street_name, house_number, borough_code)
+
+    # Blocks precomputed by the block risk job are answered with one indexed read
+    if context.block_risk:
+        return context.block_risk
+
+    most_likely_sweep_time_for_address = check_street_status(tracker,full_street_name,house_number,borough_code,context=context)
+
+    if not most_likely_sweep_time_for_address:
+        return {
+            "status": "no_data",
+            "street_name": full_street_name,
+            "house_number": house_number,
+            "message": "No sweep times available to analyze."
+        }
+
+    return calculate_ticket_likelihood_after_sweep(tracker, full_street_name, house_number, borough_code, most_likely_range=most_likely_sweep_time_for_address, context=context)
+
+
 def fetch_ticket_analysis_for_addresses(
     tracker: SweepTracker, 
-    addresses: List[Dict[str, str]]
+    addresses: List[Dict[str, str]],
+    workers: int = BATCH_WORKERS
 ) -> List[Dict[str, str]]:
-    """Fetch ticket analysis for multiple addresses."""
-    results = []
-    for address in addresses:
-        full_street_name = address['street_name']
-        house_number = address['house_number']
-        borough_code = address['borough_code']
+    """Fetch ticket analysis for multiple addresses concurrently.
 
-        most_likely_sweep_time_for_address = check_street_status(tracker,full_street_name,house_number,borough_code)
+    Returns one result per address, in input order; failures are reported as
+    {"status": "error", ...} for that address instead of stopping the batch.
+    """
+    # Street segments fetched during the batch are shared by every worker's DataFetcher
+    street_segments = {}
 
-        if most_likely_sweep_time_for_address:
-            result = calculate_ticket_likelihood_after_sweep(tracker, full_street_name, house_number, borough_code, most_likely_range=most_likely_sweep_time_for_address)
-            results.append(result)
+    def make_worker_tracker():
+        # Worker threads get their own trackers, reading the caller's CSV directory and sharing its address cache
+        worker = SweepTracker(address_mapper=tracker.address_mapper)
+        worker.data_fetcher.data_path = tracker.data_fetcher.data_path
+        worker.data_fetcher.street_segments = street_segments
+        return worker
 
-    return results
+    tracker.data_fetcher.street_segments = street_segments
+    try:
+        # Resolve every address up front with one centerline query per street, then bring their sweep
+        # histories up to date with chunked IN (...) queries, so the workers find the physical_ids in
+        # the address cache, the segments in street_segments and current histories in the sweep store
+        try:
+            physical_ids = tracker.resolve_physical_ids([a for a in addresses if a.get('street_name') and a.get('house_number')])
+            tracker.data_fetcher.sweep_store.sync(tracker.data_fetcher, [pid for pid in physical_ids if pid])
+        except Exception as e:
+            print(f"Error resolving addresses before the batch: {e}")
+
+        return run_batch(addresses, analyze_address, tracker_factory=make_worker_tracker, workers=workers)
+    finally:
+        tracker.data_fetcher.street_segments = None
 
 
 
 
 def main() -> None:
     """Main entry point for the application."""
+    # Plotting libraries are only needed here, not by modules that import main's helpers (e.g. service.py)
+    from data.visualizations import visualize_ticket_likelihood
+
     print("=" * 60)
     print("NYC Street Sweeping Tracker")
     print("=" * 60)
@@ -0,0 +1,221 @@
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from config import SERVICE_HOST, SERVICE_PORT, SERVICE_LATENCY_WINDOW
+from data.sweep_tracker import SweepTracker
+from data.address_mapper import AddressMapper
+from data.segment_context import SegmentContext
+from data.frame_cache import borough_frame_cache
+from data.instrumentation import registry
+from main import check_street_status, analyze_address
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyRecorder:
+    '''Keeps the last `window` request durations per endpoint and reports percentiles'''
+
+    def __init__(self, window=SERVICE_LATENCY_WINDOW):
+        self.window = window
+        self.samples = {}  # endpoint -> deque of milliseconds
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, milliseconds):
+        with self._lock:
+            self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(milliseconds)
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def summary(self):
+        '''endpoint -> {"count", "p50_ms", "p99_ms", "max_ms"} over the recorded window'''
+        with self._lock:
+            snapshot = {endpoint: sorted(samples) for endpoint, samples in self.samples.items()}
+            counts = dict(self.counts)
+
+        def percentile(values, p):
+            return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 3)
+
+        return {
+            endpoint: {
+                "count": counts[endpoint],
+                "p50_ms": percentile(values, 50),
+                "p99_ms": percentile(values, 99),
+                "max_ms": round(values[-1], 3),
+            }
+            for endpoint, values in snapshot.items() if values
+        }
+
+
+class SweepService:
+    '''Answers address queries from warm, process-wide caches with a pool of reused SweepTrackers'''
+
+    def __init__(self, data_path=None):
+        """
+        Initialize the SweepService.
+
+        Args:
+            data_path (str, optional): Directory with the borough violation CSVs
+                (defaults to the SweepTracker's own path).
+        """
+        self.data_path = data_path
+        self.address_mapper = AddressMapper()  # Shared by every tracker
+        self.latency = LatencyRecorder()
+        self.started = time.time()
+        # ThreadingHTTPServer starts a new thread per request, so trackers are pooled rather than
+        # kept per thread. A tracker (its DataFetcher keeps the current block) serves one request at a time.
+        self._trackers = queue.LifoQueue()
+        self.trackers_created = 0
+
+    def _new_tracker(self):
+        tracker = SweepTracker(address_mapper=self.address_mapper)
+        if self.data_path:
+            tracker.data_fetcher.data_path = self.data_path
+        self.trackers_created += 1
+        return tracker
+
+    @contextmanager
+    def tracker(self):
+        '''Borrow an idle SweepTracker from the pool (a new one if all are busy) for the duration of a request'''
+        try:
+            tracker = self._trackers.get_nowait()
+        except queue.Empty:
+            tracker = self._new_tracker()
+        try:
+            yield tracker
+        finally:
+            self._trackers.put(tracker)
+
+    def warm(self, borough_codes):
+        '''Load borough violation frames (and their block indexes) into the shared frame cache'''
+        with self.tracker() as tracker:
+            for borough_code in borough_codes:
+                tracker.data_fetcher.load_csv_for_borough(str(borough_code))
+
+    def street_status(self, address):
+        '''Most likely sweep time ranges for an address (check_street_status)'''
+        with self.tracker() as tracker:
+            context = SegmentContext(tracker, address['street_name'], address['house_number'], address['borough_code'])
+            result = check_street_status(
+                tracker, address['street_name'], address['house_number'], address['borough_code'], context=context
+            )
+        return result or {"status": "no_data", "message": "No sweep times available to analyze."}
+
+    def likelihood(self, address):
+        '''Ticket likelihood after the sweep for an address (precomputed blocks first)'''
+        with self.tracker() as tracker:
+            return analyze_address(tracker, address)
+
+    def metrics(self):
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "trackers": {"created": self.trackers_created, "idle": self._trackers.qsize()},
+            "latency": self.latency.summary(),
+            "frame_cache": borough_frame_cache.stats(),
+            "instrumentation": registry.snapshot(),
+        }
+
+
+def _address_from_query(query):
+    '''Address dictionary from ?street=...&house=...&borough=..., or None if street/house are missing'''
+    params = {name: values[0] for name, values in parse_qs(query).items()}
+    street_name = params.get('street', '').strip()
+    house_number = params.get('house', '').strip()
+    if not street_name or not house_number:
+        return None
+    return {"street_name": street_name, "house_number": house_number, "borough_code": params.get('borough') or None}
+
+
+def make_handler(service):
+    '''Request handler class bound to a SweepService'''
+
+    class Handler(BaseHTTPRequestHandler):
+        routes = {
+            '/status': service.street_status,
+            '/likelihood': service.likelihood,
+        }
+
+        def log_message(self, format, *args):
+            pass  # Latency is reported by /metrics instead of one log line per request
+
+        def _send(self, code, body, content_type='application/json'):
+            payload = (body if isinstance(body, str) else json.dumps(body, default=str)).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            start = time.perf_counter()
+            url = urlparse(self.path)
+            try:
+                if url.path == '/health':
+                    self._send(200, {"status": "ok"})
+                elif url.path == '/metrics':
+                    self._send(200, service.metrics())
+                elif url.path == '/metrics/prometheus':
+                    self._send(200, registry.to_prometheus(), content_type='text/plain; version=0.0.4')
+                elif url.path in self.routes:
+                    address = _address_from_query(url.query)
+                    if address is None:
+                        self._send(400, {"status": "error", "message": "street and house are required"})
+                    else:
+                        self._send(200, self.routes[url.path](address))
+                else:
+                    self._send(404, {"status": "error", "message": f"Unknown path {url.path}"})
+            except Exception as e:
+                logger.exception("Error handling %s", self.path)
+                self._send(500, {"status": "error", "message": str(e)})
+            finally:
+                service.latency.record(url.path, (time.perf_counter() - start) * 1000)
+
+    return Handler
+
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT, data_path=None, warm_boroughs=(), instrument=False):
+    """
+    Run the JSON service until interrupted.
+
+    Endpoints: /status and /likelihood (?street=Valentine Ave&house=2025&borough=2),
+    /metrics (p50/p99 latency per endpoint, frame cache stats, instrumentation),
+    /metrics/prometheus (instrumentation as Prometheus text) and /health.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to listen on.
+        data_path (str, optional): Directory with the borough violation CSVs.
+        warm_boroughs (iterable): Borough codes whose violation frames are loaded before serving.
+        instrument (bool): Record span timings and counters (see data.instrumentation).
+    """
+    if instrument:
+        registry.enable()
+    service = SweepService(data_path=data_path)
+    service.warm(warm_boroughs)
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Serving on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.address_mapper.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON service for street sweeping lookups")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--data-path', help="Directory with the borough violation CSVs")
+    parser.add_argument('--warm', default='', help="Comma-separated borough codes to load before serving (e.g. 1,2)")
+    parser.add_argument('--instrument', action='store_true', help="Record span timings and counters for /metrics")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.data_path, [code for code in args.warm.split(',') if code], args.instrument)
@@ -0,0 +1,188 @@
+"""Command line interface for SweepInsights.
+
+    python sweepinsights.py lookup "Valentine Ave" 2025 --borough 2
+    python sweepinsights.py batch addresses.csv --output results.jsonl
+    python sweepinsights.py sync centerline|sweeps|violations|block-risk|all --data-path path/to/csvs
+    python sweepinsights.py serve --data-path path/to/csvs --warm 2
+
+Only the standard library is imported up front; each command imports what it needs when it runs.
+A lookup of an address whose physical_id is cached and whose block was precomputed by the block
+risk job is answered from SQLite alone, without importing pandas, NumPy or the HTTP clients.
+"""
+import argparse
+import json
+import sys
+
+
+def cached_lookup(street_name, house_number, borough_code=None):
+    """
+    Answer an address from the address cache and the block risk table only.
+
+    Args:
+        street_name (str): Street name (e.g. "Valentine Ave").
+        house_number (str): House number (e.g. "2025").
+        borough_code (str, optional): Borough code (1-5).
+
+    Returns:
+        dict or None: The precomputed result, or None if the address or its block is not cached.
+    """
+    from data.address_mapper import AddressMapper
+    from data.block_risk import block_risk_table
+
+    physical_id = AddressMapper().get_cached_physical_id(street_name, house_number, borough_code)
+    if not physical_id:
+        return None
+    side = block_risk_table.side_of(physical_id, house_number)
+    if side is None:
+        return None
+    return block_risk_table.lookup(physical_id, side, street_name=street_name, house_number=house_number)
+
+
+def _make_tracker(data_path=None):
+    '''SweepTracker for the live path, reading borough CSVs from data_path when given'''
+    from data.sweep_tracker import SweepTracker
+
+    tracker = SweepTracker()
+    if data_path:
+        tracker.data_fetcher.data_path = data_path
+    return tracker
+
+
+def _print_json(result):
+    print(json.dumps(result, indent=2, default=str))
+
+
+def run_lookup(args):
+    address = {"street_name": args.street, "house_number": args.house, "borough_code": args.borough}
+    result = cached_lookup(args.street, args.house, args.borough)
+    if result is None:
+        if args.cache_only:
+            print(f"{args.house} {args.street} is not in the address cache and block risk table.", file=sys.stderr)
+            return 1
+        from main import analyze_address
+        result = analyze_address(_make_tracker(args.data_path), address)
+    _print_json(result)
+    return 0 if result.get("status") == "success" else 1
+
+
+def _read_addresses(path):
+    '''Address dictionaries from a CSV (street_name,house_number,borough_code columns) or JSON list'''
+    if path.endswith('.json'):
+        with open(path) as f:
+            return json.load(f)
+    import csv
+    with open(path, newline='') as f:
+        return [dict(row) for row in csv.DictReader(f)]
+
+
+def run_batch(args):
+    if args.addresses:
+        addresses = _read_addresses(args.addresses)
+    else:
+        from data.addresses import TEST_ADDRESSES
+        addresses = TEST_ADDRESSES
+    # Borough codes are strings everywhere downstream (CSV rows and the test addresses may hold ints)
+    addresses = [{**a, "borough_code": str(a["borough_code"]) if a.get("borough_code") else None} for a in addresses]
+
+    from main import fetch_ticket_analysis_for_addresses
+    results = fetch_ticket_analysis_for_addresses(_make_tracker(args.data_path), addresses, workers=args.workers)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for result in results:
+            out.write(json.dumps(result, default=str) + '\n')
+    finally:
+        if args.output:
+            out.close()
+    print(f"Analyzed {len(results)} addresses, {sum(r.get('status') == 'success' for r in results)} succeeded", file=sys.stderr)
+    return 0
+
+
+def run_sync(args):
+    targets = ['centerline', 'sweeps', 'violations', 'block-risk'] if args.target == 'all' else [args.target]
+    if any(target in ('violations', 'block-risk') for target in targets) and not args.data_path:
+        print("--data-path is required to sync violations and block risk", file=sys.stderr)
+        return 2
+
+    for target in targets:
+        if target == 'centerline':
+            from data.data_fetcher import DataFetcher
+            from data.centerline_store import centerline_store
+            centerline_store.sync(DataFetcher(data_path=args.data_path))
+        elif target == 'sweeps':
+            from data.data_fetcher import DataFetcher
+            from data.sweep_store import sweep_store
+            sweep_store.refresh_citywide(DataFetcher(data_path=args.data_path), since=args.since)
+        elif target == 'violations':
+            from data.violation_store import convert_all
+            convert_all(args.data_path)
+        elif target == 'block-risk':
+            from data.block_risk_job import build_block_risk
+            build_block_risk(args.data_path, sync_sweeps=args.sync_sweeps)
+    return 0
+
+
+def run_serve(args):
+    from service import serve
+    serve(args.host, args.port, args.data_path, [code for code in args.warm.split(',') if code], args.instrument)
+    return 0
+
+
+def build_parser():
+    # Defaults come from config, which only defines constants
+    from config import SERVICE_HOST, SERVICE_PORT, BATCH_WORKERS
+
+    parser = argparse.ArgumentParser(prog="sweepinsights", description="NYC street sweeping and ticket likelihood lookups")
+    parser.add_argument('--transport', choices=['live', 'record', 'replay'], help="Send, record or replay external requests")
+    parser.add_argument('--instrument', action='store_true', help="Record span timings and counters (printed to stderr at exit)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    lookup = commands.add_parser('lookup', help="Sweep window and ticket likelihood for one address")
+    lookup.add_argument('street')
+    lookup.add_argument('house')
+    lookup.add_argument('--borough', help="Borough code (1-5)")
+    lookup.add_argument('--cache-only', action='store_true', help="Answer from the caches only; exit 1 on a miss")
+    lookup.add_argument('--data-path', help="Directory with the borough violation CSVs")
+    lookup.set_defaults(func=run_lookup)
+
+    batch = commands.add_parser('batch', help="Analyze many addresses, one JSON result per line")
+    batch.add_argument('addresses', nargs='?', help="CSV or JSON file of addresses (default: the test addresses)")
+    batch.add_argument('--output', help="Write results here instead of stdout")
+    batch.add_argument('--workers', type=int, default=BATCH_WORKERS)
+    batch.add_argument('--data-path', help="Directory with the borough violation CSVs")
+    batch.set_defaults(func=run_batch)
+
+    sync = commands.add_parser('sync', help="Refresh the local mirrors and precomputed tables")
+    sync.add_argument('target', choices=['centerline', 'sweeps', 'violations', 'block-risk', 'all'])
+    sync.add_argument('--data-path', help="Directory with the borough violation CSVs")
+    sync.add_argument('--since', help="Sweeps: only visits after this timestamp")
+    sync.add_argument('--sync-sweeps', action='store_true', help="Block risk: sync each borough's sweeps first")
+    sync.set_defaults(func=run_sync)
+
+    serve = commands.add_parser('serve', help="Run the local JSON query service")
+    serve.add_argument('--host', default=SERVICE_HOST)
+    serve.add_argument('--port', type=int, default=SERVICE_PORT)
+    serve.add_argument('--data-path', help="Directory with the borough violation CSVs")
+    serve.add_argument('--warm', default='', help="Comma-separated borough codes to load before serving")
+    serve.set_defaults(func=run_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.transport:
+        from data.transport import transport
+        transport.configure(mode=args.transport)
+    if args.instrument:
+        from data.instrumentation import registry
+        registry.enable()
+
+    try:
+        return args.func(args)
+    finally:
+        if args.instrument and args.command != 'serve':
+            print(registry.to_json(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
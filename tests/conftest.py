@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from urllib.parse import urlparse
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+from benchmarks import synthetic
+from benchmarks.socrata_stub import SocrataStub, StubDataset
+
+BOROUGH = '2'
+NUM_STREETS = 2
+BLOCKS_PER_STREET = 3
+
+
+class LocalSocrata:
+    '''In-process stand-in for a Socrata client, answering get() from StubDatasets'''
+
+    def __init__(self, datasets):
+        self.datasets = {dataset_id: StubDataset(rows) for dataset_id, rows in datasets.items()}
+        self.requests = []
+
+    def get(self, dataset_identifier, where=None, select=None, order=None, limit=1000, offset=None):
+        self.requests.append((dataset_identifier, where))
+        return self.datasets[dataset_identifier].query(where=where, select=select, order=order, limit=limit, offset=offset or 0)
+
+
+class FakeServices(SocrataStub):
+    '''SocrataStub that also answers Nominatim searches and SweepNYC sign lookups, counting requests per path'''
+
+    def __init__(self, datasets):
+        super().__init__(datasets)
+        self.paths = {}
+
+    def _make_handler(self):
+        services = self
+        base = super()._make_handler()
+
+        class Handler(base):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                with services._lock:
+                    services.paths[path] = services.paths.get(path, 0) + 1
+                if path == '/search':
+                    self._send(200, [{"lat": "40.8665", "lon": "-73.8929", "display_name": "Bronx, NY", "place_id": 1}])
+                elif path == '/sweep':
+                    signs = [{"SignText": "NO PARKING (SANITATION BROOM SYMBOL) 8AM-9:30AM TUES"}]
+                    self._send(200, {"Street": synthetic.street_name(0), "Notes": json.dumps({"Signs": signs})})
+                else:
+                    super().do_GET()
+
+        return Handler
+
+    def requests_to(self, dataset_id):
+        return self.paths.get(f"/resource/{dataset_id}.json", 0)
+
+
+def pytest_configure():
+    # The data modules read these settings when they are imported, so the fake services are started
+    # and the process moved to a scratch directory (every cache path in config is relative) before collection
+    global _scratch, _services
+    _scratch = tempfile.mkdtemp(prefix='sweep_tests_')
+    os.chdir(_scratch)
+    _services = FakeServices({}).start()
+    config.SOCRATA_DOMAIN = _services.domain
+    config.SOCRATA_URI_PREFIX = "http://"
+    config.SOCRATA_CACHE_ENABLED = False  # Tests count the requests that reach the services
+    config.NOMINATIM_DOMAIN = _services.domain
+    config.NOMINATIM_SCHEME = "http"
+    config.NOMINATIM_REQUESTS_PER_SECOND = 1000.0
+    config.SWEEPNYC_API_URL = f"http://{_services.domain}/sweep"
+
+
+def pytest_unconfigure():
+    _services.stop()
+    os.chdir(PROJECT_ROOT)
+    shutil.rmtree(_scratch, ignore_errors=True)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    '''Run the test in an empty directory, so the relative cache paths in config resolve there'''
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope='session')
+def data_path():
+    '''Directory with a synthetic violations CSV for BOROUGH'''
+    path = os.path.join(_scratch, 'csvs')
+    synthetic.write_borough_csv(path, BOROUGH, rows=20000, num_streets=NUM_STREETS, blocks_per_street=BLOCKS_PER_STREET)
+    return path
+
+
+@pytest.fixture(scope='session')
+def fake_services():
+    '''The fake Socrata/Nominatim/SweepNYC server, serving the synthetic centerline and sweep history of BOROUGH'''
+    centerline = synthetic.centerline_records(BOROUGH, NUM_STREETS, BLOCKS_PER_STREET)
+    sweeps = synthetic.sweep_records([record['physicalid'] for record in centerline], visits_per_segment=30)
+    _services.datasets.update({
+        config.DATASET_IDS['street_centerline']: StubDataset(centerline, index_columns=['full_street_name']),
+        config.DATASET_IDS['sweep_nyc']: StubDataset(sweeps, index_columns=['physical_id']),
+    })
+    return _services
@@ -0,0 +1,54 @@
+import config
+from benchmarks import synthetic
+from conftest import BOROUGH
+from data import data_fetcher
+from data.sweep_store import SweepStore
+from data.sweep_tracker import SweepTracker
+from main import fetch_ticket_analysis_for_addresses
+
+
+def make_tracker(data_path):
+    tracker = SweepTracker()
+    tracker.data_fetcher.data_path = data_path
+    return tracker
+
+
+def test_batch_keeps_input_order_and_reports_errors(fake_services, data_path):
+    addresses = [
+        {"street_name": synthetic.street_name(1), "house_number": "151", "borough_code": BOROUGH},
+        {"street_name": synthetic.street_name(0), "borough_code": BOROUGH},  # No house number
+        {"street_name": "Nowhere St", "house_number": "10", "borough_code": BOROUGH},
+        {"street_name": synthetic.street_name(0), "house_number": "42", "borough_code": BOROUGH},
+    ]
+
+    results = fetch_ticket_analysis_for_addresses(make_tracker(data_path), addresses, workers=4)
+
+    assert [result["status"] for result in results] == ["success", "error", "no_data", "success"]
+    assert [results[i]["house_number"] for i in (0, 2, 3)] == ["151", "10", "42"]
+    assert results[1]["address"] == synthetic.street_name(0)
+    assert "house_number" in results[1]["message"]
+
+
+def test_batch_workers_read_the_callers_data_path(fake_services, data_path):
+    addresses = [{"street_name": synthetic.street_name(0), "house_number": str(n), "borough_code": BOROUGH} for n in (5, 120, 250)]
+
+    for workers in (1, 3):
+        results = fetch_ticket_analysis_for_addresses(make_tracker(data_path), addresses, workers=workers)
+        assert all(result["status"] == "success" and result["total_violations"] > 0 for result in results)
+
+
+def test_batch_fetches_each_street_and_the_sweeps_once(fake_services, data_path, workdir, monkeypatch):
+    monkeypatch.setattr(data_fetcher, 'sweep_store', SweepStore(str(workdir / 'sweeps.sqlite3')))
+    houses = ("7", "33", "140", "162", "275", "288")
+    addresses = [
+        {"street_name": synthetic.street_name(street), "house_number": house, "borough_code": BOROUGH}
+        for street in range(2) for house in houses
+    ]
+    datasets = (config.DATASET_IDS['street_centerline'], config.DATASET_IDS['sweep_nyc'])
+    before = [fake_services.requests_to(dataset) for dataset in datasets]
+
+    results = fetch_ticket_analysis_for_addresses(make_tracker(data_path), addresses, workers=4)
+
+    assert all(result["status"] == "success" for result in results)
+    # One query per street, and the sweep history of all 12 segments in a single IN (...) query
+    assert [fake_services.requests_to(dataset) - count for dataset, count in zip(datasets, before)] == [2, 1]
@@ -0,0 +1,51 @@
+import pandas as pd
+import config
+from benchmarks import synthetic
+from conftest import LocalSocrata
+from data import block_risk_job
+from data.block_index import BlockIndex
+from data.centerline_store import CenterlineStore
+from data.data_fetcher import DataFetcher
+from data.sweep_store import SweepStore
+
+BOROUGH = '2'
+
+
+def test_block_index_matches_street_spellings():
+    frame = pd.DataFrame({
+        'Street Name': ['VALENTINE AVE', 'Valentine Avenue', 'VALENTINE AV', 'GRAND CONCOURSE'],
+        'Violation Code': [21, 21, 21, 21],
+        'House Number': ['2001', '2011', '2021', '2001'],
+    })
+    index = BlockIndex(frame)
+
+    assert len(index.lookup('VALENTINE AVENUE', 21)) == 3
+    assert len(index.lookup('Valentine Ave', 21, block_range=('2001', '2015'))) == 2
+
+
+def test_compute_borough_matches_centerline_and_violation_spellings(workdir, monkeypatch):
+    data_path = str(workdir / 'csvs')
+    synthetic.write_borough_csv(data_path, BOROUGH, rows=20000, num_streets=2, blocks_per_street=3)
+
+    # The violation CSV says "SYNTH 0 AVE"; the centerline spells the suffix out
+    centerline = synthetic.centerline_records(BOROUGH, num_streets=2, blocks_per_street=3)
+    for record in centerline:
+        record['full_street_name'] = record['full_street_name'].replace(' AVE', ' AVENUE')
+    physical_ids = [record['physicalid'] for record in centerline]
+
+    fetcher = DataFetcher(data_path=data_path)
+    fetcher.client = LocalSocrata({
+        config.DATASET_IDS['street_centerline']: centerline,
+        config.DATASET_IDS['sweep_nyc']: synthetic.sweep_records(physical_ids, visits_per_segment=20),
+    })
+    store = CenterlineStore(str(workdir / 'centerline'))
+    store.sync(fetcher)
+    sweeps = SweepStore(str(workdir / 'sweeps.sqlite3'))
+    sweeps.sync(fetcher, physical_ids)
+    monkeypatch.setattr(block_risk_job, 'centerline_store', store)
+    monkeypatch.setattr(block_risk_job, 'sweep_store', sweeps)
+
+    rows = block_risk_job.compute_borough(BOROUGH, data_path)
+
+    assert len(rows) == 2 * len(centerline)
+    assert all(row['total_violations'] > 0 for row in rows)
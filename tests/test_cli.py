@@ -0,0 +1,30 @@
+import json
+from benchmarks import synthetic
+from conftest import BOROUGH
+import sweepinsights
+
+
+def test_batch_reads_the_data_path_option(fake_services, data_path, tmp_path):
+    addresses = tmp_path / 'addresses.csv'
+    addresses.write_text(
+        "street_name,house_number,borough_code\n"
+        f"{synthetic.street_name(0)},42,{BOROUGH}\n"
+        f"{synthetic.street_name(1)},151,{BOROUGH}\n"
+        "Nowhere St,10,2\n"
+    )
+    output = tmp_path / 'results.jsonl'
+
+    status = sweepinsights.main(['batch', str(addresses), '--output', str(output), '--data-path', data_path, '--workers', '2'])
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert status == 0
+    assert [result["house_number"] for result in results] == ["42", "151", "10"]
+    assert [result["status"] for result in results] == ["success", "success", "no_data"]
+    assert all(result["total_violations"] > 0 for result in results[:2])
+
+
+def test_cache_only_lookup_misses_without_the_caches(workdir, capsys):
+    status = sweepinsights.main(['lookup', synthetic.street_name(0), '42', '--borough', BOROUGH, '--cache-only'])
+
+    assert status == 1
+    assert "not in the address cache" in capsys.readouterr().err
@@ -0,0 +1,25 @@
+from geoclient.sign_rules_cache import SignRulesCache
+
+
+def test_cross_street_result_is_cached_for_the_requested_street(workdir):
+    cache = SignRulesCache(str(workdir / 'sign_rules.sqlite3'))
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return {"street": "E 183 ST", "rules": ["NO PARKING 8AM-9:30AM TUES"]}
+
+    first = cache.get_or_fetch("Valentine Ave", "dr72qx8", fetch)
+    second = cache.get_or_fetch("Valentine Avenue", "dr72qx8", fetch)
+
+    assert first == second
+    assert len(fetches) == 1
+
+
+def test_streets_in_one_cell_are_cached_separately(workdir):
+    cache = SignRulesCache(str(workdir / 'sign_rules.sqlite3'))
+
+    cache.get_or_fetch("Valentine Ave", "dr72qx8", lambda: {"street": "VALENTINE AVE", "rules": ["A"]})
+    other = cache.get_or_fetch("E 183 St", "dr72qx8", lambda: {"street": "E 183 ST", "rules": ["B"]})
+
+    assert other["rules"] == ["B"]
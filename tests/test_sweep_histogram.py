@@ -0,0 +1,21 @@
+import pytest
+
+from data.sweep_histogram import sweep_time_histogram, sweep_time_histograms
+
+VISITS = ["2024-05-01T09:12:00.000", "2024-05-02T09:20:00.000", "2024-05-03T11:05:00.000"]
+
+
+@pytest.mark.parametrize("top_k", [0, -1])
+def test_top_k_below_one_is_rejected(top_k):
+    with pytest.raises(ValueError, match="top_k"):
+        sweep_time_histogram(VISITS, bin_minutes=30, top_k=top_k)
+    with pytest.raises(ValueError, match="top_k"):
+        sweep_time_histograms(["1", "1", "2"], VISITS, bin_minutes=30, top_k=top_k)
+
+
+def test_top_k_of_one_reports_only_the_most_common_interval():
+    result = sweep_time_histogram(VISITS, bin_minutes=30, top_k=1)
+
+    assert result["most_common"]["interval"] == "09:00 - 09:30"
+    assert result["second_most_common"] is None
+    assert len(result["top_intervals"]) == 1
@@ -0,0 +1,16 @@
+from data.sweep_store import SweepStore
+
+
+def test_store_drops_visits_without_a_usable_date(workdir):
+    store = SweepStore(str(workdir / 'sweeps.sqlite3'))
+    store._store([
+        {"physical_id": "1", "date_visited": "2024-05-01T09:30:00.000"},
+        {"physical_id": "1", "date_visited": "2024-05-03T10:00:00.000"},
+        {"physical_id": "1", "date_visited": "not a date"},
+        {"physical_id": "1", "date_visited": "NaT"},
+        {"physical_id": "1"},
+    ], synced_ids=["1"])
+
+    assert [record["date_visited"] for record in store.records("1", limit=5)] == [
+        "2024-05-03T10:00:00.000", "2024-05-01T09:30:00.000"
+    ]
@@ -0,0 +1,13 @@
+import numpy as np
+import pandas as pd
+from data.violation_schema import apply_violation_schema
+
+
+def test_issue_dates_in_other_formats_are_parsed_and_failures_reported(capsys):
+    frame = pd.DataFrame({'Issue Date': ['05/01/2024', '2024-05-03T00:00:00.000', '05/02/24', None, 'junk', 'junk']})
+
+    dates = apply_violation_schema(frame)['Issue Date'].to_numpy()
+
+    assert list(dates[:3]) == list(np.array(['2024-05-01', '2024-05-03', '2024-05-02'], dtype='datetime64[s]'))
+    assert np.isnat(dates[3:]).all()
+    assert "Could not parse 2 Issue Date values" in capsys.readouterr().out